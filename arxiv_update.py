@@ -2,9 +2,19 @@ import time
 import os
 import argparse
 import logging
+from contextlib import nullcontext
 from ArXiv_Tools import arxiv_logger
-from ArXiv_Tools.report import filter_arxiv_to_md
+from ArXiv_Tools.report import filter_arxiv_to_md, _load_zotero
 from ArXiv_Tools.codex import query_args
+from ArXiv_Tools.announce_calendar import plan_fetch
+from ArXiv_Tools.revisit import revisit
+from ArXiv_Tools.fulltext import FulltextCache
+from ArXiv_Tools.server import serve
+from ArXiv_Tools.profiling import RunProfiler, profile_dir
+from ArXiv_Tools.watchlist import Watchlist
+from ArXiv_Tools.rollup import refresh_rollups
+from ArXiv_Tools.deadline import parse_deadline, load_deferred
+from ArXiv_Tools.export import export_site
 
 logger = arxiv_logger
 
@@ -79,15 +89,83 @@ Time format examples:
 
                             advance:  https://arxiv.org/search/advanced
                             catchup:  https://arxiv.org/catchup ''')
+    parser.add_argument("--dry_run", action='store_true',
+                        help="Only print the fetch plan and the estimated request count")
+    parser.add_argument("--fetch_workers", default=2, type=int,
+                        help="Concurrent arXiv requests")
+    parser.add_argument("--parse_workers", default=2, type=int,
+                        help="Parser processes (0 parses in the main process)")
+    parser.add_argument("--summary_workers", default=4, type=int,
+                        help="Concurrent AI summary requests")
+    parser.add_argument("--fulltext", default=None, choices=['pdf', 'source'],
+                        help="Build AI summaries of not collected papers from their PDF or source tarball")
+    parser.add_argument("--fulltext_top_n", default=0, type=int,
+                        help="Only read the full text of the first N not collected papers per day (0: all)")
+    parser.add_argument("--fulltext_cache_mb", default=2048, type=int,
+                        help="Size limit of the full text cache in <arxiv_folder>/.fulltext_cache")
+    parser.add_argument("--serve", action='store_true',
+                        help="Serve the fetched data as a local JSON API instead of fetching")
+    parser.add_argument("--port", default=8765, type=int,
+                        help="Port of the --serve API (bound to 127.0.0.1)")
+    parser.add_argument("--export", default=None, type=str,
+                        help="Export the fetched data as a static JSON/HTML site to this folder instead of fetching")
+    parser.add_argument("--profile", action='store_true',
+                        help="Profile the run, pstats and collapsed stacks go to <arxiv_folder>/.profile/")
+    parser.add_argument("--profile_sample_ms", default=10, type=float,
+                        help="Stack sampling interval for the flamegraph files (0 disables sampling)")
+    parser.add_argument("--watchlist", default=None, type=str,
+                        help="File of watched authors (one per line, optional '| group'), pinned on top of day reports")
+    parser.add_argument("--layout", default='default', choices=['default', 'frontmatter', 'stubs'],
+                        help='''Output layout for Dataview.
+
+                            default:      day reports only
+                            frontmatter:  YAML id arrays on day reports and monthly index notes
+                            stubs:        frontmatter plus one metadata note per paper ''')
+    parser.add_argument("--deadline", default=None, type=str,
+                        help="HH:MM or minutes from now. Reports are written first, AI summaries are added "
+                             "by priority until then and the rest is deferred")
+    parser.add_argument("--top_up", action='store_true',
+                        help="Only refetch the days with deferred AI summaries and summarize them")
+    parser.add_argument("--rollups", action='store_true',
+                        help="Maintain weekly/monthly/yearly digests in <arxiv_folder>/<category>/digests/")
+    parser.add_argument("--revisit_budget", default=0, type=int,
+                        help="Number of past days per category to refetch for post-publication changes")
 
     args = parser.parse_args() 
     arxiv_folder = args.arxiv_folder
     categroy = args.categroy
     time_ = args.time
-    ai_summary = args.ai_summary
+    ai_summary = args.ai_summary or args.top_up
     ai_provider = args.ai_provider
     use_url = args.use_url
+    dry_run = args.dry_run
+    revisit_budget = args.revisit_budget
+    pipeline_options = dict(fetch_workers=args.fetch_workers,
+                           parse_workers=args.parse_workers,
+                           summary_workers=args.summary_workers,
+                           layout=args.layout)
+    if args.deadline:
+        pipeline_options['deadline'] = parse_deadline(args.deadline)
+        logger.info(f"Deadline: {time.strftime('%H:%M:%S', time.localtime(pipeline_options['deadline']))}")
+    if args.watchlist:
+        pipeline_options['watchlist'] = Watchlist.from_file(args.watchlist)
+        logger.info(f"Watching {pipeline_options['watchlist'].__len__()} authors")
+    fulltext_options = {}
+    if args.fulltext:
+        fulltext_options = dict(
+            fulltext_cache=FulltextCache(os.path.join(arxiv_folder, '.fulltext_cache'),
+                                         max_bytes=args.fulltext_cache_mb * 1024 ** 2),
+            fulltext_kind=args.fulltext,
+            fulltext_top_n=args.fulltext_top_n)
     
+    if args.serve:
+        serve(arxiv_folder, categroy.split(','), port=args.port)
+        exit(0)
+
+    if args.export:
+        export_site(arxiv_folder, categroy.split(','), args.export)
+        exit(0)
+
     # Display settings
     logger.info(f"AI Summary: {'Enabled' if ai_summary else 'Disabled'}")
     if ai_summary:
@@ -100,6 +178,23 @@ Time format examples:
         logger.error(str(e))
         exit(1)
     
+    if dry_run:
+        n_requests = 0
+        for cat_ in categroy.split(','):
+            plan = plan_fetch(time_specs, os.path.join(arxiv_folder, cat_), use_url)
+            n_requests += len(plan)
+            dates = ', '.join(f'{y}-{m:02}-{d:02}' for y, m, d in plan)
+            logger.info(f'{cat_}: {len(plan)} requests: {dates}')
+        logger.info(f'Estimated arXiv requests: {n_requests}')
+        exit(0)
+
+    profiler = None
+    if args.profile:
+        profiler = RunProfiler(profile_dir(arxiv_folder), sample_interval=args.profile_sample_ms / 1000)
+
+    # Downloaded once, shared by every fetch and revisit of every category
+    pipeline_options['Zot_'] = _load_zotero()
+
     for cat_ in categroy.split(','):
         md_folder = os.path.join(arxiv_folder, cat_)
         try:
@@ -108,32 +203,60 @@ Time format examples:
             logger.error(f'Category: {cat_} not supported, create issue to remind author')
             raise RuntimeError
         
-        for year, month, day in time_specs:
-            if day is None:
-                # Process entire month
-                logger.info(f'Script is running to fetch {cat_} {year}.{month:02} (all days)')
-                filter_arxiv_to_md(
-                    year=year,
-                    month=month,
-                    md_folder=md_folder,
-                    query_args=_query_args,
-                    category=cat_,
-                    include_ai_summary=ai_summary,
-                    ai_provider=ai_provider,
-                    specific_day=None,
-                    use_url=use_url
-                )
-            else:
-                # Process specific day
-                logger.info(f'Script is running to fetch {cat_} {year}.{month:02}.{day:02} (single day)')
-                filter_arxiv_to_md(
-                    year=year,
-                    month=month,
-                    md_folder=md_folder,
-                    query_args=_query_args,
-                    category=cat_,
-                    include_ai_summary=ai_summary,
-                    ai_provider=ai_provider,
-                    specific_day=day,
-                    use_url=use_url
-                )
\ No newline at end of file
+        if args.top_up:
+            fetches = [tuple(int(x) for x in d.split('-')) for d in sorted(load_deferred(md_folder), reverse=True)]
+            logger.info(f'{cat_}: {len(fetches)} days with deferred AI summaries')
+        else:
+            fetches = time_specs
+
+        with profiler.section(cat_) if profiler else nullcontext():
+            for year, month, day in fetches:
+                if args.top_up and args.deadline and time.time() > pipeline_options['deadline']:
+                    logger.info('Deadline reached, the remaining days stay deferred')
+                    break
+                if day is None:
+                    # Process entire month
+                    logger.info(f'Script is running to fetch {cat_} {year}.{month:02} (all days)')
+                    filter_arxiv_to_md(
+                        year=year,
+                        month=month,
+                        md_folder=md_folder,
+                        query_args=_query_args,
+                        category=cat_,
+                        include_ai_summary=ai_summary,
+                        ai_provider=ai_provider,
+                        specific_day=None,
+                        use_url=use_url,
+                        **pipeline_options,
+                        **fulltext_options
+                    )
+                else:
+                    # Process specific day
+                    logger.info(f'Script is running to fetch {cat_} {year}.{month:02}.{day:02} (single day)')
+                    filter_arxiv_to_md(
+                        year=year,
+                        month=month,
+                        md_folder=md_folder,
+                        query_args=_query_args,
+                        category=cat_,
+                        include_ai_summary=ai_summary,
+                        ai_provider=ai_provider,
+                        specific_day=day,
+                        use_url=use_url,
+                        **pipeline_options,
+                        **fulltext_options
+                    )
+
+            if revisit_budget > 0:
+                revisit(md_folder, revisit_budget, query_args=_query_args, category=cat_, use_url=use_url,
+                        include_ai_summary=ai_summary, ai_provider=ai_provider,
+                        **pipeline_options, **fulltext_options)
+
+            if args.rollups:
+                refresh_rollups(md_folder)
+
+    if fulltext_options:
+        fulltext_options['fulltext_cache'].close()
+
+    if profiler:
+        profiler.finish()
@@ -0,0 +1,106 @@
+"""
+Vault query time on a synthetic multi-year vault.
+
+Answers "which papers were collected, over the whole history" three ways:
+
+    scan         read every day report and parse its headings and task lists,
+                 which is what a cross-day Dataview TASK query has to do
+    frontmatter  read only the frontmatter arrays of every day report
+    index        read only the monthly index notes
+
+    python benchmarks/vault_query.py --years 3 --papers 80
+"""
+import os
+import time
+import random
+import argparse
+import tempfile
+from ArXiv_Tools.report import _gen_arxiv_markdown, _write_day_report, iter_day_reports
+from ArXiv_Tools.dataview import read_frontmatter, write_month_index, INDEX_DIR
+from ArXiv_Tools.announce_calendar import announcement_days
+
+
+def build_vault(md_folder, years, papers_per_day):
+    random.seed(0)
+    n_days = 0
+    for year in range(2025 - years, 2025):
+        for month in range(1, 13):
+            for day in announcement_days(year, month):
+                papers = []
+                for i in range(papers_per_day):
+                    arxiv_id = f'arXiv:{year % 100:02}{month:02}.{day:02}{i:03}'
+                    authors = [f'Author {random.randint(0, 5000)}' for _ in range(5)]
+                    papers.append({
+                        'arxiv_id': arxiv_id,
+                        'title': f'Paper {arxiv_id}',
+                        'authors': authors,
+                        'collected': random.random() < 0.1,
+                        'watched': [],
+                        'markdown': _gen_arxiv_markdown(arxiv_id, f'Paper {arxiv_id}', authors, 'x ' * 600),
+                    })
+                _write_day_report(md_folder, 'quant-ph', f'{year}-{month:02}-{day:02}', papers, 'frontmatter')
+                n_days += 1
+            write_month_index(md_folder, 'quant-ph', f'{year}', f'{month:02}')
+    return n_days
+
+
+def day_files(md_folder):
+    for _, file_path in iter_day_reports(md_folder):
+        yield file_path
+
+
+def query_scan(md_folder):
+    collected = []
+    for file_path in day_files(md_folder):
+        section = None
+        with open(file_path, "r", encoding="utf-8") as f:
+            for line in f:
+                if line.startswith('## '):
+                    section = line[3:].strip()
+                elif line.startswith('### arXiv:') and section == 'collected':
+                    collected.append(line[4:].strip())
+    return collected
+
+
+def query_frontmatter(md_folder):
+    collected = []
+    for file_path in day_files(md_folder):
+        collected += read_frontmatter(file_path).get('collected', [])
+    return collected
+
+
+def query_index(md_folder):
+    collected = []
+    index_dir = os.path.join(md_folder, INDEX_DIR)
+    for name in os.listdir(index_dir):
+        collected += read_frontmatter(os.path.join(index_dir, name)).get('collected', [])
+    return collected
+
+
+def timed(func, md_folder, repeat=3):
+    best = float('inf')
+    for _ in range(repeat):
+        t = time.perf_counter()
+        res = func(md_folder)
+        best = min(best, time.perf_counter() - t)
+    return best, res
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--years", default=3, type=int, help="Years of synthetic data")
+    parser.add_argument("--papers", default=80, type=int, help="Papers per day")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        md_folder = os.path.join(tmp, 'quant-ph')
+        t = time.perf_counter()
+        n_days = build_vault(md_folder, args.years, args.papers)
+        print(f'Built {n_days} day reports, {n_days * args.papers} papers in {time.perf_counter() - t:.1f}s')
+
+        results = {}
+        for name, func in [('scan', query_scan), ('frontmatter', query_frontmatter), ('index', query_index)]:
+            seconds, collected = timed(func, md_folder)
+            results[name] = sorted(collected)
+            print(f'{name:12s} {seconds * 1000:9.1f} ms  {collected.__len__()} collected papers')
+        assert results['scan'] == results['frontmatter'] == results['index']
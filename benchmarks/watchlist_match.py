@@ -0,0 +1,72 @@
+"""
+Watchlist matching time with a large list of watched authors.
+
+Matches the author lists of a synthetic day of papers against N watched
+names, through the (last name, first initial) index and, for comparison,
+by comparing every author with every watched name.
+
+    python benchmarks/watchlist_match.py --watched 10000 --papers 80
+"""
+import time
+import random
+import argparse
+from ArXiv_Tools.watchlist import Watchlist, normalize_name, _given_names_match
+
+FIRST = ['Anna', 'Bo', 'Carlos', 'Da-Wei', 'Erwin', 'Fatima', 'Giulia', 'Hiroshi', 'Ines', 'Jan', 'Le', 'Paul']
+LAST = ['Wang', 'Schrödinger', 'van der Waals', 'Dirac', 'Müller', 'Nguyen', 'Kowalski', 'Silva', 'Okafor']
+
+
+def random_name(rng):
+    first, last = rng.choice(FIRST), f'{rng.choice(LAST)}{rng.randint(0, 2000)}'
+    form = rng.random()
+    if form < 0.3:
+        return f'{first[0]}. {last}'
+    if form < 0.4:
+        return f'{last}, {first}'
+    return f'{first} {last}'
+
+
+def build(n_watched, n_papers, seed=0):
+    rng = random.Random(seed)
+    watched = [(random_name(rng), None) for _ in range(n_watched)]
+    days = [[random_name(rng) for _ in range(5)] for _ in range(n_papers)]
+    return watched, days
+
+
+def match_linear(names, authors):
+    """Every author against every normalized watched name, what the index avoids"""
+    found = []
+    for author in authors:
+        last, first = normalize_name(author)
+        if first and any(last == w_last and w_first and first[0][0] == w_first[0][0]
+                         and _given_names_match(first, w_first) for w_last, w_first in names):
+            found.append(author)
+    return found
+
+
+def timed(func, repeat=3):
+    best = float('inf')
+    for _ in range(repeat):
+        normalize_name.cache_clear()
+        t = time.perf_counter()
+        res = func()
+        best = min(best, time.perf_counter() - t)
+    return best, res
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--watched", default=10000, type=int, help="Number of watched names")
+    parser.add_argument("--papers", default=80, type=int, help="Papers per day, 5 authors each")
+    args = parser.parse_args()
+
+    watched, days = build(args.watched, args.papers)
+    seconds, watchlist = timed(lambda: Watchlist(watched))
+    print(f'index build  {seconds * 1000:9.1f} ms  {watchlist.__len__()} watched names')
+
+    seconds, indexed = timed(lambda: [watchlist.match(authors) for authors in days])
+    print(f'index match  {seconds * 1000:9.1f} ms  {sum(map(len, indexed))} matches in {args.papers} papers')
+    names = [normalize_name(name) for name, _ in watched]
+    seconds, linear = timed(lambda: [match_linear(names, authors) for authors in days], repeat=1)
+    print(f'linear match {seconds * 1000:9.1f} ms')
+    assert indexed == linear
@@ -1,6 +1,7 @@
 import os
 import sys
 import subprocess
+import urllib.request
 import time
 import datetime
 import logging
@@ -17,10 +18,17 @@ SCRIPT_NAME = "arxiv_update.py"
 # 参数配置
 CATEGORY = "chem-ph,quant-ph"
 AI_PROVIDER = "gemini"
+SERVE_URL = None  # 例如 "http://127.0.0.1:8765"，抓取完成后通知 --serve 进程增量刷新
+PROFILE_EVERY_N = 0  # 每 N 次运行带 --profile 采集一次性能数据 (写入 ARXIV_FOLDER/.profile)，0 表示关闭
+EXPORT_DIR = None  # 例如 "/var/www/arxiv"，抓取完成后增量导出静态网页 (只重建有变化的月份)
+REVISIT_BUDGET = 0  # 每个分类每天回访多少个历史日期 (检查标签/DOI 变化)，0 表示关闭
+ROLLUPS = False  # 是否维护每周/每月/每年的汇总笔记 (ARXIV_FOLDER/<分类>/digests)
 
 # 日志配置
 LOG_FILE = "/root/software/zawu/arxiv_tools/log/arxiv_daily_fetch.log"
 RUN_TIME = "10:00"  # 设定每天运行的时间 (24小时制)
+DEADLINE_MINUTES = None  # 报告必须在开始后多少分钟内完成 (AI 总结按优先级生成，其余推迟)，None 表示不限
+TOP_UP_TIME = None  # 补做被推迟的 AI 总结的时间，None 表示关闭
 
 # API Keys (如果需要从环境变量加载，保持 os.environ.get，或者直接填入字符串)
 # os.environ["GOOGLE_API_KEY"] = "你的KEY" 
@@ -45,9 +53,10 @@ def setup_logger():
     return logger
 
 logger = setup_logger()
+run_count = 0
 
-def job():
-    """执行核心任务"""
+def job(top_up=False):
+    """执行核心任务 (top_up=True 时只补做被推迟的 AI 总结)"""
     logger.info("========================================")
     logger.info("Starting ArXiv Daily Fetch Task")
     
@@ -72,9 +81,24 @@ def job():
         "--categroy", CATEGORY, # 注意：原脚本里拼写是 --categroy，如果那是笔误请修正为 --category
         "--ai_summary",
         "--ai_provider", AI_PROVIDER,
-        "--arxiv_folder", ARXIV_FOLDER
+        "--arxiv_folder", ARXIV_FOLDER,
     ]
+    if DEADLINE_MINUTES:
+        cmd += ["--deadline", str(DEADLINE_MINUTES)]
+    if top_up:
+        # 补做只生成推迟的 AI 总结，回访和汇总已在早上的运行中完成
+        cmd.append("--top_up")
+    else:
+        if REVISIT_BUDGET:
+            cmd += ["--revisit_budget", str(REVISIT_BUDGET)]
+        if ROLLUPS:
+            cmd.append("--rollups")
     
+    global run_count
+    run_count += 1
+    if PROFILE_EVERY_N and run_count % PROFILE_EVERY_N == 0:
+        cmd.append("--profile")
+
     logger.info(f"Running command: {' '.join(cmd)}")
 
     try:
@@ -100,6 +124,8 @@ def job():
         # 5. 检查结果
         if result.returncode == 0:
             logger.info(f"SUCCESS: Papers fetched successfully for {target_date}")
+            notify_server()
+            export_site()
         else:
             logger.error(f"ERROR: Script failed with return code {result.returncode}")
 
@@ -109,6 +135,28 @@ def job():
     logger.info("Task completed.")
     logger.info("========================================")
 
+def notify_server():
+    """通知 --serve 进程重新读取有变化的日报"""
+    if not SERVE_URL:
+        return
+    try:
+        request = urllib.request.Request(f"{SERVE_URL}/refresh", data=b"", method="POST")
+        with urllib.request.urlopen(request, timeout=30) as response:
+            logger.info(f"Query server refreshed: {response.read().decode()}")
+    except Exception as e:
+        logger.warning(f"Failed to notify query server: {str(e)}")
+
+def export_site():
+    """增量导出静态网页，供不用 Obsidian 的同事浏览"""
+    if not EXPORT_DIR:
+        return
+    cmd = [PYTHON_PATH, SCRIPT_NAME, "--categroy", CATEGORY, "--arxiv_folder", ARXIV_FOLDER, "--export", EXPORT_DIR]
+    result = subprocess.run(cmd, cwd=PROJECT_DIR, capture_output=True, text=True, check=False)
+    if result.returncode == 0:
+        logger.info(f"Static site exported to {EXPORT_DIR}")
+    else:
+        logger.warning(f"Failed to export static site:\n{result.stderr}")
+
 def main():
     logger.info(f"Scheduler started. Task will run daily at {RUN_TIME}")
     
@@ -117,6 +165,8 @@ def main():
 
     # 设定定时任务
     schedule.every().day.at(RUN_TIME).do(job)
+    if TOP_UP_TIME:
+        schedule.every().day.at(TOP_UP_TIME).do(job, top_up=True)
 
     while True:
         schedule.run_pending()
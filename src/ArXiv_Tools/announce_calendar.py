@@ -0,0 +1,130 @@
+import os
+import json
+import calendar
+import threading
+from datetime import date, datetime
+from . import arxiv_logger
+
+logger = arxiv_logger
+
+# arXiv mails new listings Monday to Friday; the catchup page of any other
+# date is empty, so there is nothing to fetch on weekends.
+MAILING_WEEKDAYS = (0, 1, 2, 3, 4)
+
+# A weekday only counts as "no mailing" once it came back empty on this many
+# separate runs, so a single failed request does not hide a real mailing day.
+EMPTY_THRESHOLD = 2
+
+CALENDAR_FILE = '.calendar.json'
+
+_lock = threading.Lock()
+
+
+def _calendar_file(md_folder):
+    return os.path.join(md_folder, CALENDAR_FILE)
+
+
+def load_empty_days(md_folder):
+    """
+    Load the empty-response counters learned for a category folder.
+
+    Returns:
+        dict: 'YYYY-MM-DD' -> number of runs that saw no papers on that date
+    """
+    file_path = _calendar_file(md_folder)
+    if not os.path.exists(file_path):
+        return {}
+    try:
+        with open(file_path, "r", encoding="utf-8") as f:
+            return json.load(f).get('empty', {})
+    except (OSError, ValueError) as e:
+        logger.warning(f'Failed to read {file_path}: {e}')
+        return {}
+
+
+def record_empty_day(md_folder, date_string, today=None):
+    """
+    Remember that `date_string` returned no papers.
+
+    Only dates in the past are learned: today's listing may simply not be
+    announced yet.
+    """
+    today = today or date.today()
+    if datetime.strptime(date_string, "%Y-%m-%d").date() >= today:
+        return
+    with _lock:
+        empty = load_empty_days(md_folder)
+        empty[date_string] = empty.get(date_string, 0) + 1
+        os.makedirs(md_folder, exist_ok=True)
+        with open(_calendar_file(md_folder), "w", encoding="utf-8") as f:
+            json.dump({'empty': empty}, f, indent=1, sort_keys=True)
+
+
+def announcement_days(year, month, use_url='catchup'):
+    """
+    Days of a month that can carry papers.
+
+    The advanced search filters on submission date, which includes weekends,
+    so only dates that do not exist (e.g. 02-30) are dropped for it.
+    """
+    n_days = calendar.monthrange(year, month)[1]
+    days = range(1, n_days + 1)
+    if use_url == 'catchup':
+        days = [day for day in days if date(year, month, day).weekday() in MAILING_WEEKDAYS]
+    return list(days)
+
+
+def plan_days(year, month, md_folder=None, specific_day=None, use_url='catchup', today=None):
+    """
+    Minimal list of days worth requesting for one month of one category.
+
+    Args:
+        year: Year to fetch
+        month: Month to fetch
+        md_folder: Category folder holding the learned calendar, optional
+        specific_day: If set, plan only this day
+        use_url: 'catchup' or 'advance'
+        today: Reference date, future days are never requested
+
+    Returns:
+        list: Day numbers to fetch
+    """
+    today = today or date.today()
+    candidates = announcement_days(year, month, use_url)
+    if specific_day is not None:
+        if specific_day not in candidates:
+            if specific_day > calendar.monthrange(year, month)[1]:
+                reason = 'the date does not exist'
+            else:
+                reason = 'arXiv does not announce on weekends'
+            logger.info(f'Skip {year}-{month:02}-{specific_day:02}: not an announcement day, {reason}')
+        candidates = [day for day in candidates if day == specific_day]
+
+    empty = load_empty_days(md_folder) if md_folder else {}
+    days = []
+    for day in candidates:
+        date_string = f'{year}-{month:02}-{day:02}'
+        if date(year, month, day) > today:
+            if specific_day is not None:
+                logger.info(f'Skip {date_string}: in the future')
+            continue
+        if empty.get(date_string, 0) >= EMPTY_THRESHOLD:
+            if specific_day is not None:
+                logger.info(f'Skip {date_string}: no mailing on it in {EMPTY_THRESHOLD} earlier runs')
+            continue
+        days.append(day)
+    return days
+
+
+def plan_fetch(time_specs, md_folder=None, use_url='catchup', today=None):
+    """
+    Expand the output of `parse_time_argument` into concrete fetch dates.
+
+    Returns:
+        list: (year, month, day) tuples, one request each
+    """
+    plan = []
+    for year, month, day in time_specs:
+        for d in plan_days(year, month, md_folder, day, use_url, today):
+            plan.append((year, month, d))
+    return plan
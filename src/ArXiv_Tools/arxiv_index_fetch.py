@@ -1,6 +1,7 @@
 import re
 from urllib.parse import urlencode
 import feedparser
+import requests
 from datetime import datetime
 from bs4 import BeautifulSoup
 # from . import arxiv_logger
@@ -12,35 +13,60 @@ sub = 'quant-ph'
 
 search_url = 'https://arxiv.org/search/advanced?'
 
-test_url = 'https://arxiv.org/search/advanced?advanced=&terms-0-term=&terms-0-operator=AND&terms-0-field=title&classification-physics=y&classification-physics_archives=quant-ph&classification-include_cross_list=include&date-filter_by=date_range&date-year=&date-from_date=2025-02-01&date-to_date=2025-02-02&date-date_type=submitted_date&abstracts=show&size=200&order=submitted_date'
+# Seconds to wait for arXiv, a hung response must not block a run with a --deadline
+FETCH_TIMEOUT = 60
 
+test_url = 'https://arxiv.org/search/advanced?advanced=&terms-0-term=&terms-0-operator=AND&terms-0-field=title&classification-physics=y&classification-physics_archives=quant-ph&classification-include_cross_list=include&date-filter_by=date_range&date-year=&date-from_date=2025-02-01&date-to_date=2025-02-02&date-date_type=submitted_date&abstracts=show&size=200&order=submitted_date'
 
 
-def query_arxiv_dict(date_from_date='2025-02-01', date_to_date='2025-02-02', query_args=quant_ph):
 
+def _advance_url(date_from_date, date_to_date, query_args):
+    query_args = dict(query_args) # callers share the module level dicts
     query_args['date-from_date'] = date_from_date
     query_args['date-to_date'] = date_to_date
 
-    query_dict = {}
-
     url_args = re.sub(
             "%2B", "+", urlencode(query_args)
         )
-    # print(url_args)
+    return search_url + url_args
+
+
+def fetch_arxiv_advance(date_from_date='2025-02-01', date_to_date='2025-02-02', query_args=quant_ph):
+    """
+    Download one advanced search result page.
 
-    url = search_url + url_args
-    # print(url)
+    Returns:
+        str: HTML summary of the result page, to be passed to `parse_arxiv_advance`,
+             or None if the request failed
+    """
+    url = _advance_url(date_from_date, date_to_date, query_args)
     logger.info(f'Querying ArXiv URL: {url}')
-    results = feedparser.parse(url)
+    try:
+        # feedparser cannot time out by itself
+        response = requests.get(url, timeout=FETCH_TIMEOUT)
+        response.raise_for_status()
+    except requests.RequestException as e:
+        logger.error(f'Failed to fetch URL: {e}')
+        return None
+    results = feedparser.parse(response.text)
+
+    return results['feed']['summary']
 
-    summary_text = results['feed']['summary']
+
+def parse_arxiv_advance(summary_text):
+    """
+    Parse the page returned by `fetch_arxiv_advance`.
+
+    Returns:
+        dict: Dictionary with arxiv_id as key and [title, authors, abstract, doi_info] as value
+    """
+    query_dict = {}
 
     so = BeautifulSoup(summary_text, 'lxml')
 
 
     find_results = so.find_all(class_='arxiv-result')
 
-    tmp_res = []
     for res in find_results:
         aso = BeautifulSoup(res.__str__(), 'lxml')
 
@@ -70,36 +96,52 @@ def query_arxiv_dict(date_from_date='2025-02-01', date_to_date='2025-02-02', que
             query_dict[arxiv_id] = [title, authors, abstract, (external_doi, href_link) ]
         else:
             query_dict[arxiv_id] = [title, authors, abstract, () ]
-        # tmp_res.append([arxiv_id, title, authors, abstract])
 
     return query_dict
 
-import requests
+
+def query_arxiv_dict(date_from_date='2025-02-01', date_to_date='2025-02-02', query_args=quant_ph):
+
+    summary_text = fetch_arxiv_advance(date_from_date, date_to_date, query_args)
+    if summary_text is None:
+        return {}
+    return parse_arxiv_advance(summary_text)
+
 catchup_url = 'https://arxiv.org/catchup/'
 
-def query_arxiv_catchup(subject='physics.chem-ph', date='2025-12-02'):
+def fetch_arxiv_catchup(subject='physics.chem-ph', date='2025-12-02'):
     """
-    Query arXiv catchup page for new submissions and cross-lists.
-    
+    Download one arXiv catchup page.
+
     Args:
         subject: arXiv subject code (e.g., 'physics.chem-ph', 'quant-ph')
         date: Date in format 'YYYY-MM-DD'
-    
+
     Returns:
-        dict: Dictionary with arxiv_id as key and [title, authors, abstract, doi_info] as value
+        str: Page HTML, or None if the request failed
     """
     catchup_url = f'https://arxiv.org/catchup/{subject}/{date}?abs=True'
     
     logger.info(f'Querying ArXiv Catchup URL: {catchup_url}')
     
     try:
-        response = requests.get(catchup_url)
+        response = requests.get(catchup_url, timeout=FETCH_TIMEOUT)
         response.raise_for_status()
     except requests.RequestException as e:
         logger.error(f'Failed to fetch URL: {e}')
-        return {}
-    
-    soup = BeautifulSoup(response.text, 'html.parser')
+        return None
+
+    return response.text
+
+
+def parse_arxiv_catchup(html):
+    """
+    Parse the page returned by `fetch_arxiv_catchup`.
+
+    Returns:
+        dict: Dictionary with arxiv_id as key and [title, authors, abstract, doi_info] as value
+    """
+    soup = BeautifulSoup(html, 'html.parser')
     query_dict = {}
     
     # Find all article sections (dt/dd pairs)
@@ -175,6 +217,30 @@ def query_arxiv_catchup(subject='physics.chem-ph', date='2025-12-02'):
     return query_dict
 
 
+def query_arxiv_catchup(subject='physics.chem-ph', date='2025-12-02'):
+    """
+    Query arXiv catchup page for new submissions and cross-lists.
+    
+    Args:
+        subject: arXiv subject code (e.g., 'physics.chem-ph', 'quant-ph')
+        date: Date in format 'YYYY-MM-DD'
+    
+    Returns:
+        dict: Dictionary with arxiv_id as key and [title, authors, abstract, doi_info] as value
+    """
+    html = fetch_arxiv_catchup(subject, date)
+    if html is None:
+        return {}
+    return parse_arxiv_catchup(html)
+
+
+def catchup_subject(query_args=quant_ph):
+    """arXiv subject code of the catchup page matching `query_args`"""
+    if 'terms-1-term' in query_args:
+        return query_args['terms-1-term']
+    return query_args['classification-physics_archives']
+
+
 def query_arxiv_catchup_dict(date='2025-12-02', query_args=quant_ph):
     """
     Wrapper function to match the original API style.
@@ -186,12 +252,7 @@ def query_arxiv_catchup_dict(date='2025-12-02', query_args=quant_ph):
     Returns:
         dict: Dictionary with arxiv_id as key and [title, authors, abstract, doi_info] as value
     """
-    if query_args == quant_ph:
-        subject = 'quant-ph'
-    elif query_args == chem_ph:
-        subject = 'physics.chem-ph'
-
-    return query_arxiv_catchup(subject=subject, date=date)
+    return query_arxiv_catchup(subject=catchup_subject(query_args), date=date)
 
 
 if __name__ == '__main__':
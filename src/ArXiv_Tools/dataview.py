@@ -0,0 +1,122 @@
+import os
+import json
+from . import arxiv_logger
+
+logger = arxiv_logger
+
+LAYOUTS = ('default', 'frontmatter', 'stubs')
+INDEX_DIR = 'index'
+PAPER_DIR = 'papers'
+
+
+def _yaml(fields):
+    # JSON scalars and flow sequences are valid YAML, and are read back by `read_frontmatter`
+    lines = ['---']
+    lines += [f'{key}: {json.dumps(value, ensure_ascii=False)}' for key, value in fields.items()]
+    lines += ['---', '']
+    return '\n'.join(lines) + '\n'
+
+
+def read_frontmatter(file_path):
+    """
+    Read the frontmatter written by this module, without reading the rest of the note.
+
+    Returns:
+        dict: Frontmatter fields, empty if the note has none
+    """
+    fields = {}
+    with open(file_path, "r", encoding="utf-8") as f:
+        if f.readline().rstrip('\n') != '---':
+            return fields
+        for line in f:
+            line = line.rstrip('\n')
+            if line == '---':
+                break
+            key, _, value = line.partition(': ')
+            try:
+                fields[key] = json.loads(value)
+            except ValueError:
+                fields[key] = value
+    return fields
+
+
+def day_frontmatter(date_string, category, papers):
+    """
+    Compact per-day frontmatter, so Dataview can query a day without its task lists.
+
+    Args:
+        papers: Records of `iter_papers` (arxiv_id, collected, watched)
+    """
+    ids = sorted(paper['arxiv_id'] for paper in papers)
+    return _yaml({
+        'date': date_string,
+        'category': category,
+        'tags': [f'{category}-{date_string}'],
+        'total': ids.__len__(),
+        'papers': ids,
+        'collected': sorted(p['arxiv_id'] for p in papers if p['collected']),
+        'watched': sorted(p['arxiv_id'] for p in papers if p.get('watched')),
+    })
+
+
+def write_paper_stubs(md_folder, category, date_string, papers):
+    """One small note per paper under papers/YYYY/MM/, holding only metadata"""
+    year, month, day = date_string.split('-')
+    stub_dir = os.path.join(md_folder, PAPER_DIR, year, month)
+    os.makedirs(stub_dir, exist_ok=True)
+    for paper in papers:
+        arxiv_id = paper['arxiv_id']
+        number = arxiv_id.replace('arXiv:', '')
+        note = _yaml({
+            'arxiv': arxiv_id,
+            'date': date_string,
+            'category': category,
+            'title': paper['title'],
+            'authors': paper['authors'],
+            'collected': paper['collected'],
+            'watched': paper.get('watched', []),
+            'url': f'https://arxiv.org/abs/{number}',
+        })
+        note += f"# {paper['title']}\n\n[{date_string}](../../../{year}/{month}/{day}.md)\n"
+        with open(os.path.join(stub_dir, f'{number}.md'), "w", encoding="utf-8") as f:
+            f.write(note)
+
+
+def write_month_index(md_folder, category, year, month):
+    """
+    Sharded index note of one month, built from the frontmatter of its day reports.
+
+    Returns:
+        str: Path of the index note, None if the month has no day reports
+    """
+    # report imports this module
+    from .report import iter_day_reports
+    days, papers, collected, watched = [], [], [], []
+    for _, file_path in iter_day_reports(md_folder, int(year), int(month)):
+        fields = read_frontmatter(file_path)
+        if 'papers' not in fields:
+            continue
+        days.append(fields['date'])
+        papers += fields['papers']
+        collected += fields.get('collected', [])
+        watched += fields.get('watched', [])
+    if not days:
+        return None
+
+    index_dir = os.path.join(md_folder, INDEX_DIR)
+    os.makedirs(index_dir, exist_ok=True)
+    index_file = os.path.join(index_dir, f'{year}-{month}.md')
+    note = _yaml({
+        'category': category,
+        'month': f'{year}-{month}',
+        'days': days,
+        'total': papers.__len__(),
+        'n_collected': collected.__len__(),
+        'papers': papers,
+        'collected': collected,
+        'watched': watched,
+    })
+    note += f'# {category} {year}-{month} index\n'
+    with open(index_file, "w", encoding="utf-8") as f:
+        f.write(note)
+    return index_file
@@ -0,0 +1,119 @@
+import os
+import json
+import time
+import threading
+from datetime import datetime, timedelta
+from . import arxiv_logger
+
+logger = arxiv_logger
+
+SUMMARY_FILE = '.summaries.json'
+DEFERRED_FILE = '.deferred.json'
+RUNS_FILE = '.runs.jsonl'
+
+
+def parse_deadline(text, now=None):
+    """
+    Turn a --deadline argument into an epoch time.
+
+    Args:
+        text: 'HH:MM' (local time, tomorrow if it has already passed today)
+              or a number of minutes from now
+
+    Returns:
+        float: Deadline as seconds since the epoch
+    """
+    now = time.time() if now is None else now
+    if ':' in text:
+        hour, minute = (int(x) for x in text.split(':'))
+        start = datetime.fromtimestamp(now)
+        deadline = start.replace(hour=hour, minute=minute, second=0, microsecond=0)
+        if deadline <= start:
+            deadline += timedelta(days=1)
+        return deadline.timestamp()
+    return now + float(text) * 60
+
+
+def prioritize(papers):
+    """Most wanted summaries first: watched authors, then not collected, then newest day"""
+    papers = sorted(papers, key=lambda p: p['date'], reverse=True)
+    return sorted(papers, key=lambda p: (not p.get('watched'), p['collected']))
+
+
+class SummaryCache:
+    """
+    AI summaries already generated for a category, so a paper is never
+    summarized twice: re-rendering a day, revisiting it or topping up a
+    deferred run reuses them.
+    """
+
+    def __init__(self, md_folder):
+        self.file_path = os.path.join(md_folder, SUMMARY_FILE)
+        self._lock = threading.Lock()
+        self._dirty = False
+        self.summaries = {}
+        if os.path.exists(self.file_path):
+            try:
+                with open(self.file_path, "r", encoding="utf-8") as f:
+                    self.summaries = json.load(f)
+            except (OSError, ValueError) as e:
+                logger.warning(f'Failed to read {self.file_path}: {e}')
+
+    def get(self, arxiv_id):
+        """
+        Returns:
+            tuple: (summary, translated title, provider), or None
+        """
+        with self._lock:
+            entry = self.summaries.get(arxiv_id)
+        return tuple(entry) if entry is not None else None
+
+    def put(self, arxiv_id, summary, title_translated, provider):
+        with self._lock:
+            self.summaries[arxiv_id] = [summary, title_translated, provider]
+            self._dirty = True
+
+    def save(self):
+        with self._lock:
+            if not self._dirty:
+                return
+            os.makedirs(os.path.dirname(self.file_path), exist_ok=True)
+            tmp_file = self.file_path + '.tmp'
+            with open(tmp_file, "w", encoding="utf-8") as f:
+                json.dump(self.summaries, f, ensure_ascii=False)
+            os.replace(tmp_file, self.file_path)
+            self._dirty = False
+
+
+def load_deferred(md_folder):
+    """
+    Returns:
+        dict: 'YYYY-MM-DD' -> arXiv ids still waiting for an AI summary
+    """
+    file_path = os.path.join(md_folder, DEFERRED_FILE)
+    if not os.path.exists(file_path):
+        return {}
+    try:
+        with open(file_path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError) as e:
+        logger.warning(f'Failed to read {file_path}: {e}')
+        return {}
+
+
+def update_deferred(md_folder, deferred_by_day):
+    """Replace the deferred papers of the given days, days without any are dropped"""
+    deferred = load_deferred(md_folder)
+    for date_string, ids in deferred_by_day.items():
+        if ids:
+            deferred[date_string] = sorted(ids)
+        else:
+            deferred.pop(date_string, None)
+    with open(os.path.join(md_folder, DEFERRED_FILE), "w", encoding="utf-8") as f:
+        json.dump(deferred, f, indent=1, sort_keys=True)
+    return deferred
+
+
+def record_run(md_folder, record):
+    with open(os.path.join(md_folder, RUNS_FILE), "a", encoding="utf-8") as f:
+        f.write(json.dumps(record, ensure_ascii=False) + '\n')
@@ -0,0 +1,326 @@
+import os
+import re
+import json
+import unicodedata
+from .report import parse_day_report, iter_day_reports, load_state
+from .watchlist import normalize_name
+from . import arxiv_logger
+
+logger = arxiv_logger
+
+MANIFEST_FILE = 'manifest.json'
+# Bumped when the shard or index format changes, an older manifest triggers a full export
+MANIFEST_VERSION = 2
+DATA_DIR = 'data'
+INDEX_DIR = 'index'
+
+_word = re.compile(r'[a-z0-9]+')
+
+# Shortest indexed token, also the shortest search term of the page: last names like Li, Wu or Xu
+MIN_TOKEN = 2
+
+# Too frequent in titles to narrow a search down
+_stopwords = {
+    'of', 'in', 'on', 'to', 'an', 'at', 'by', 'as', 'is', 'we', 'or',
+    'the', 'and', 'for', 'with', 'from', 'via', 'its', 'are', 'into', 'using', 'based', 'between',
+    'new', 'their', 'this', 'that', 'towards', 'toward', 'under', 'over', 'through', 'without',
+}
+
+
+def _tokens(text):
+    text = text.lower()
+    if not text.isascii():
+        text = unicodedata.normalize('NFKD', text)
+        text = ''.join(c for c in text if not unicodedata.combining(c))
+    return {t for t in _word.findall(text) if len(t) >= MIN_TOKEN and t not in _stopwords}
+
+
+def _author_key(author):
+    last, first = normalize_name(author)
+    return f'{last} {first[0][0]}' if first else last
+
+
+def _dump(file_path, data):
+    os.makedirs(os.path.dirname(file_path), exist_ok=True)
+    tmp_file = file_path + '.tmp'
+    with open(tmp_file, "w", encoding="utf-8") as f:
+        # json.dumps runs the C encoder, json.dump streams through the pure Python one
+        f.write(json.dumps(data, ensure_ascii=False, separators=(',', ':')))
+    os.replace(tmp_file, file_path)
+
+
+def _load_manifest(out_dir):
+    file_path = os.path.join(out_dir, MANIFEST_FILE)
+    empty = {'version': MANIFEST_VERSION, 'shards': {}}
+    manifest = load_state(file_path, empty)
+    if manifest.get('version') != MANIFEST_VERSION:
+        logger.info(f'{file_path} is from an older version, exporting everything')
+        return empty
+    return manifest
+
+
+def _month_files(arxiv_folder, category):
+    """
+    Returns:
+        dict: 'YYYY-MM' -> {'YYYY-MM-DD': file path}
+    """
+    months = {}
+    for date_string, file_path in iter_day_reports(os.path.join(arxiv_folder, category)):
+        months.setdefault(date_string[:7], {})[date_string] = file_path
+    return months
+
+
+def _build_shard(category, month, day_files):
+    """
+    Parse the day reports of one month.
+
+    Returns:
+        tuple: (shard data, manifest entry holding the shard's share of the indexes,
+                tokens pointing into its `ids`)
+    """
+    days, ids, authors, tokens = [], [], {}, {}
+    n_collected = 0
+    for date_string, file_path in sorted(day_files.items(), reverse=True):
+        report = parse_day_report(file_path)
+        if report is None:
+            continue
+        papers = []
+        for paper in report['papers']:
+            arxiv_id = paper['arxiv_id']
+            record = dict(paper)
+            if arxiv_id in report['watched']:
+                record['watched'] = report['watched'][arxiv_id]
+            papers.append(record)
+            ids.append(arxiv_id)
+            n_collected += paper['collected']
+            words = _tokens(paper['title'])
+            for author in paper['authors']:
+                key = _author_key(author)
+                if key:
+                    authors.setdefault(key, author)
+                    last = key.split(' ')[0]
+                    if len(last) >= MIN_TOKEN:
+                        words.add(last)
+            for word in words:
+                tokens.setdefault(word, []).append(ids.__len__() - 1)
+        days.append({'date': date_string, 'updated': report['updated'], 'papers': papers})
+
+    shard = {'category': category, 'month': month, 'days': days}
+    entry = {
+        'days': [d['date'] for d in days],
+        'n_collected': n_collected,
+        'ids': ids,
+        'authors': authors,
+        'tokens': tokens,
+    }
+    return shard, entry
+
+
+def _write_indexes(out_dir, shards):
+    """
+    Merge the per-shard index data of the manifest into the files the page loads:
+
+        index/shards.json   [{shard, category, month, days, total, collected}], newest first
+        index/ids.json      arXiv id -> shard number
+        index/authors.json  author key -> [name, [shard numbers]]
+        index/search.json   {ids: [arXiv id], tokens: {token: [id numbers]}}
+    """
+    names = sorted(shards, key=lambda s: (s.split('/')[1], s), reverse=True)
+    shard_list, ids, authors = [], {}, {}
+    search_ids, search_pos, tokens = [], {}, {}
+    for n, name in enumerate(names):
+        entry = shards[name]
+        category, month = name.split('/')
+        shard_list.append({
+            'shard': name,
+            'category': category,
+            'month': month,
+            'days': entry['days'],
+            'total': entry['ids'].__len__(),
+            'collected': entry['n_collected'],
+        })
+        positions = []
+        for arxiv_id in entry['ids']:
+            ids.setdefault(arxiv_id, n)
+            if arxiv_id not in search_pos:
+                search_pos[arxiv_id] = search_ids.__len__()
+                search_ids.append(arxiv_id)
+            positions.append(search_pos[arxiv_id])
+        for key, author in entry['authors'].items():
+            record = authors.setdefault(key, [author, []])
+            record[1].append(n)
+        for token, token_ids in entry['tokens'].items():
+            tokens.setdefault(token, set()).update(positions[i] for i in token_ids)
+
+    index_dir = os.path.join(out_dir, INDEX_DIR)
+    _dump(os.path.join(index_dir, 'shards.json'), shard_list)
+    _dump(os.path.join(index_dir, 'ids.json'), ids)
+    _dump(os.path.join(index_dir, 'authors.json'), authors)
+    _dump(os.path.join(index_dir, 'search.json'),
+          {'ids': search_ids, 'tokens': {t: sorted(p) for t, p in sorted(tokens.items())}})
+
+
+def export_site(arxiv_folder, categories, out_dir):
+    """
+    Export the day reports as a static site of JSON shards and a browsing page.
+
+    Shards hold one category and month (data/<category>/YYYY-MM.json). Only the
+    shards with a day report whose mtime or size changed since the last export
+    are rebuilt; the global indexes are merged from the manifest without
+    re-reading the other shards.
+
+    Args:
+        arxiv_folder: Folder holding one folder of day reports per category
+        categories: Categories to export, shards of other categories are kept
+        out_dir: Output folder, can be served by any static file server
+
+    Returns:
+        int: Number of shards rebuilt or removed
+    """
+    manifest = _load_manifest(out_dir)
+    shards = manifest['shards']
+    n_changed = 0
+    for category in categories:
+        months = _month_files(arxiv_folder, category)
+        for month, day_files in months.items():
+            name = f'{category}/{month}'
+            stamps = {}
+            for date_string, file_path in day_files.items():
+                st = os.stat(file_path)
+                stamps[date_string] = [st.st_mtime, st.st_size]
+            shard_file = os.path.join(out_dir, DATA_DIR, category, f'{month}.json')
+            if shards.get(name, {}).get('stamps') == stamps and os.path.exists(shard_file):
+                continue
+            shard, entry = _build_shard(category, month, day_files)
+            entry['stamps'] = stamps
+            _dump(shard_file, shard)
+            shards[name] = entry
+            n_changed += 1
+        for name in [s for s in shards if s.split('/')[0] == category and s.split('/')[1] not in months]:
+            del shards[name]
+            shard_file = os.path.join(out_dir, DATA_DIR, category, f"{name.split('/')[1]}.json")
+            if os.path.exists(shard_file):
+                os.remove(shard_file)
+            n_changed += 1
+
+    if n_changed or not os.path.isdir(os.path.join(out_dir, INDEX_DIR)):
+        _write_indexes(out_dir, shards)
+        _dump(os.path.join(out_dir, MANIFEST_FILE), manifest)
+    with open(os.path.join(out_dir, 'index.html'), "w", encoding="utf-8") as f:
+        f.write(_PAGE.replace('__MIN_TOKEN__', str(MIN_TOKEN)))
+    logger.info(f'Export: {n_changed} shards rebuilt, {shards.__len__()} shards in {out_dir}')
+    return n_changed
+
+
+_PAGE = r'''<!DOCTYPE html>
+<html>
+<head>
+<meta charset="utf-8">
+<title>arXiv feed</title>
+<style>
+body { font-family: sans-serif; margin: 0; display: flex; height: 100vh; }
+nav { width: 16em; overflow-y: auto; border-right: 1px solid #ccc; padding: .5em; }
+main { flex: 1; overflow-y: auto; padding: 0 1.5em; }
+nav a { display: block; text-decoration: none; padding: 1px 0; }
+input { width: 100%; box-sizing: border-box; margin-bottom: .3em; }
+.paper { border-bottom: 1px solid #eee; padding: .5em 0; }
+.meta { color: #666; font-size: .9em; }
+.collected { color: #080; }
+.watched { color: #b60; }
+details { margin-top: .3em; }
+</style>
+</head>
+<body>
+<nav>
+<input id="search" placeholder="Search titles (Enter)">
+<input id="author" placeholder="Author (Enter)">
+<div id="months"></div>
+</nav>
+<main id="main"></main>
+<script>
+const cache = {};
+function load(path) {
+  if (!(path in cache)) cache[path] = fetch(path).then(r => r.json());
+  return cache[path];
+}
+const shard = name => load('data/' + name + '.json');
+const norm = s => s.normalize('NFKD').replace(/[\u0300-\u036f]/g, '').toLowerCase();
+const esc = s => String(s).replace(/[&<>"]/g, c => ({'&': '&amp;', '<': '&lt;', '>': '&gt;', '"': '&quot;'}[c]));
+
+function paperHtml(p, date) {
+  const num = p.arxiv_id.replace('arXiv:', '');
+  let html = `<div class="paper"><a href="https://arxiv.org/abs/${num}">${esc(p.arxiv_id)}</a> <b>${esc(p.title)}</b>`;
+  if (p.title_translated) html += `<br>${esc(p.title_translated)}`;
+  html += `<div class="meta">${esc(date)} &middot; ${esc(p.authors.join(', '))}`;
+  if (p.collected) html += ' &middot; <span class="collected">collected</span>';
+  if (p.watched) html += ` &middot; <span class="watched">${esc(p.watched.join('; '))}</span>`;
+  html += '</div>';
+  if (p.ai_summary) html += `<details><summary>AI Summary</summary>${esc(p.ai_summary)}</details>`;
+  if (p.abstract) html += `<details><summary>Abstract</summary>${esc(p.abstract)}</details>`;
+  return html + '</div>';
+}
+
+async function showShard(name) {
+  const data = await shard(name);
+  let html = `<h2>${esc(data.category)} ${esc(data.month)}</h2>`;
+  for (const day of data.days) {
+    html += `<h3>${esc(day.date)} (${day.papers.length})</h3>`;
+    for (const p of day.papers) html += paperHtml(p, day.date);
+  }
+  document.getElementById('main').innerHTML = html;
+}
+
+async function showIds(text, ids) {
+  const [shards, idShard] = await Promise.all([load('index/shards.json'), load('index/ids.json')]);
+  const wanted = new Set(ids);
+  // Only the shards of the newest hits are downloaded
+  const names = [...new Set(ids.map(i => shards[idShard[i]].shard))].slice(0, 24);
+  let html = '', shown = 0;
+  for (const data of await Promise.all(names.map(shard))) {
+    for (const day of data.days) {
+      for (const p of day.papers) if (wanted.has(p.arxiv_id)) { html += paperHtml(p, day.date); shown++; }
+    }
+  }
+  document.getElementById('main').innerHTML = `<h2>${shown} of ${ids.length} results for "${esc(text)}"</h2>` + html;
+}
+
+async function search(text) {
+  const index = await load('index/search.json');
+  const terms = norm(text).match(/[a-z0-9]{__MIN_TOKEN__,}/g) || [];
+  const keys = Object.keys(index.tokens);
+  let hits = null;
+  for (const term of terms) {
+    const found = new Set();
+    for (const key of keys) if (key.startsWith(term)) index.tokens[key].forEach(i => found.add(i));
+    hits = hits === null ? found : new Set([...hits].filter(i => found.has(i)));
+  }
+  const ids = [...(hits || [])].sort((a, b) => a - b).map(i => index.ids[i]);
+  return showIds(text, ids);
+}
+
+async function searchAuthor(text) {
+  const [authors, shards] = await Promise.all([load('index/authors.json'), load('index/shards.json')]);
+  const q = norm(text);
+  const matches = Object.entries(authors).filter(([key, a]) => key.includes(q) || norm(a[0]).includes(q)).slice(0, 50);
+  let html = `<h2>Authors matching "${esc(text)}"</h2>`;
+  for (const [, [name, nums]] of matches) {
+    html += `<p><b>${esc(name)}</b>: ` + nums.map(n => `<a href="#${esc(shards[n].shard)}">${esc(shards[n].shard)}</a>`).join(', ') + '</p>';
+  }
+  document.getElementById('main').innerHTML = html;
+}
+
+async function init() {
+  const shards = await load('index/shards.json');
+  document.getElementById('months').innerHTML = shards.map(s =>
+    `<a href="#${esc(s.shard)}">${esc(s.shard)} <span class="meta">${s.collected}/${s.total}</span></a>`).join('');
+  const route = () => { const name = decodeURIComponent(location.hash.slice(1)); if (name) showShard(name); };
+  window.addEventListener('hashchange', route);
+  if (!location.hash && shards.length) location.hash = shards[0].shard; else route();
+  document.getElementById('search').addEventListener('keydown', e => { if (e.key === 'Enter') search(e.target.value); });
+  document.getElementById('author').addEventListener('keydown', e => { if (e.key === 'Enter') searchAuthor(e.target.value); });
+}
+init();
+</script>
+</body>
+</html>
+'''
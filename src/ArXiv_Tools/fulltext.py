@@ -0,0 +1,196 @@
+import os
+import io
+import gzip
+import json
+import time
+import hashlib
+import tarfile
+import threading
+import requests
+from . import arxiv_logger
+
+logger = arxiv_logger
+
+FULLTEXT_URLS = {
+    'pdf': 'https://arxiv.org/pdf/',
+    'source': 'https://arxiv.org/e-print/',
+}
+
+
+def _extract_pdf_text(data):
+    try:
+        from pypdf import PdfReader
+    except ImportError:
+        logger.warning('pypdf is not installed, PDF text extraction is disabled')
+        return None
+    reader = PdfReader(io.BytesIO(data))
+    return '\n'.join(page.extract_text() or '' for page in reader.pages)
+
+
+def _extract_source_text(data):
+    """Concatenate the .tex files of an arXiv source tarball (or a single gzipped .tex)"""
+    try:
+        with tarfile.open(fileobj=io.BytesIO(data), mode='r:*') as tar:
+            texts = []
+            for member in tar.getmembers():
+                if member.isfile() and member.name.endswith('.tex'):
+                    texts.append(tar.extractfile(member).read().decode('utf-8', errors='replace'))
+            return '\n'.join(texts)
+    except tarfile.TarError:
+        pass
+    try:
+        data = gzip.decompress(data)
+    except OSError:
+        pass
+    return data.decode('utf-8', errors='replace')
+
+
+_extractors = {
+    'pdf': _extract_pdf_text,
+    'source': _extract_source_text,
+}
+
+
+class FulltextCache:
+    """
+    Size bounded, content addressed disk cache of downloaded papers.
+
+    Blobs are stored once per sha256 under `objects/`, next to the text that
+    was extracted from them, so a paper is neither downloaded nor parsed twice.
+    `index.json` maps '<kind>:<arxiv_id>' to its blob and last access time;
+    the least recently used entries are evicted once the cache exceeds
+    `max_bytes`.
+    """
+
+    def __init__(self, root, max_bytes=2 * 1024 ** 3, urls=None, timeout=60):
+        self.root = root
+        self.max_bytes = max_bytes
+        self.urls = urls or FULLTEXT_URLS
+        self.timeout = timeout
+        self._lock = threading.Lock()
+        self._key_locks = {}
+        os.makedirs(os.path.join(root, 'objects'), exist_ok=True)
+        self.index = self._load_index()
+
+    def _index_file(self):
+        return os.path.join(self.root, 'index.json')
+
+    def _load_index(self):
+        if not os.path.exists(self._index_file()):
+            return {}
+        try:
+            with open(self._index_file(), "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning(f'Failed to read fulltext cache index: {e}')
+            return {}
+
+    def _save_index(self):
+        tmp_file = self._index_file() + '.tmp'
+        with open(tmp_file, "w", encoding="utf-8") as f:
+            json.dump(self.index, f)
+        os.replace(tmp_file, self._index_file())
+
+    def _blob_path(self, sha):
+        return os.path.join(self.root, 'objects', sha[:2], sha)
+
+    def _read_text(self, entry):
+        text_file = self._blob_path(entry['sha']) + '.txt'
+        if not os.path.exists(text_file):
+            return None
+        with open(text_file, "r", encoding="utf-8") as f:
+            return f.read()
+
+    def _download(self, arxiv_id, kind):
+        url = self.urls[kind] + arxiv_id.replace('arXiv:', '')
+        logger.info(f'Downloading {url}')
+        response = requests.get(url, timeout=self.timeout)
+        response.raise_for_status()
+        return response.content
+
+    def _store(self, data, kind):
+        """
+        Write a downloaded blob and its extracted text.
+
+        Returns:
+            tuple: (sha256, bytes on disk), (None, 0) if no text could be
+                   extracted; nothing is kept then, so the next request retries
+        """
+        sha = hashlib.sha256(data).hexdigest()
+        blob_file = self._blob_path(sha)
+        size = data.__len__()
+        if not os.path.exists(blob_file + '.txt'):
+            # Extract before writing anything: a blob on disk means its text is done
+            if data[:4] == b'%PDF':
+                # e-print of a PDF-only submission
+                kind = 'pdf'
+            text = _extractors[kind](data)
+            if text is None:
+                return None, 0
+            os.makedirs(os.path.dirname(blob_file), exist_ok=True)
+            with open(blob_file + '.txt', "w", encoding="utf-8") as f:
+                f.write(text)
+            with open(blob_file, "wb") as f:
+                f.write(data)
+        size += os.path.getsize(blob_file + '.txt')
+        return sha, size
+
+    def _evict(self):
+        sizes = {entry['sha']: entry['size'] for entry in self.index.values()}
+        total = sum(sizes.values())
+        for key in sorted(self.index, key=lambda k: self.index[k]['atime']):
+            if total <= self.max_bytes:
+                break
+            sha = self.index.pop(key)['sha']
+            if any(entry['sha'] == sha for entry in self.index.values()):
+                continue
+            total -= sizes[sha]
+            for path in (self._blob_path(sha), self._blob_path(sha) + '.txt'):
+                if os.path.exists(path):
+                    os.remove(path)
+
+    def get_text(self, arxiv_id, kind='pdf'):
+        """
+        Full text of a paper, downloading and extracting it on a cache miss.
+
+        Returns:
+            str: Extracted text, or None if it could not be downloaded or extracted
+        """
+        key = f'{kind}:{arxiv_id}'
+        with self._lock:
+            key_lock = self._key_locks.setdefault(key, threading.Lock())
+
+        # Concurrent requests for the same paper wait for the first download
+        with key_lock:
+            with self._lock:
+                entry = self.index.get(key)
+                # A blob without its text (older caches) is fetched again
+                if entry is not None and os.path.exists(self._blob_path(entry['sha']) + '.txt'):
+                    entry['atime'] = time.time()
+                    return self._read_text(entry)
+
+            try:
+                data = self._download(arxiv_id, kind)
+                sha, size = self._store(data, kind)
+            except Exception as e:
+                logger.warning(f'Failed to fetch {kind} of {arxiv_id}: {e}')
+                return None
+
+            if sha is None:
+                logger.warning(f'No text could be extracted from the {kind} of {arxiv_id}')
+                with self._lock:
+                    self.index.pop(key, None)
+                return None
+
+            with self._lock:
+                entry = {'sha': sha, 'size': size, 'atime': time.time()}
+                self.index[key] = entry
+                self._evict()
+                self._save_index()
+                return self._read_text(entry)
+
+    def close(self):
+        """Save the access times of cache hits, which are only written on a miss otherwise"""
+        with self._lock:
+            self._save_index()
+
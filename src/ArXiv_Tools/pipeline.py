@@ -0,0 +1,106 @@
+import queue
+import threading
+from .profiling import profile_thread
+from . import arxiv_logger
+
+logger = arxiv_logger
+
+_DONE = object()
+
+
+class Pipeline:
+    """
+    Streaming stages connected by bounded queues.
+
+    Each stage runs `func(item, emit)` on its own worker threads and may call
+    `emit` any number of times per item. A full queue blocks the upstream
+    workers, so a slow stage applies backpressure instead of letting work pile
+    up in memory. Iterating the pipeline yields the output of the last stage as
+    soon as it is ready; leaving the loop early stops every worker.
+
+    Example:
+        pipe = Pipeline(dates, queue_size=8)
+        pipe.add_stage('fetch', fetch, n_workers=2)
+        pipe.add_stage('parse', parse, n_workers=2)
+        for item in pipe:
+            ...
+    """
+
+    def __init__(self, source, queue_size=8):
+        self.source = source
+        self.queue_size = queue_size
+        self.stages = []
+        self._stop = threading.Event()
+
+    def add_stage(self, name, func, n_workers=1):
+        self.stages.append((name, func, max(1, n_workers)))
+        return self
+
+    def _put(self, q, item):
+        while not self._stop.is_set():
+            try:
+                q.put(item, timeout=0.1)
+                return
+            except queue.Full:
+                continue
+
+    def _get(self, q):
+        while not self._stop.is_set():
+            try:
+                return q.get(timeout=0.1)
+            except queue.Empty:
+                continue
+        return _DONE
+
+    def _feed(self, out_q):
+        try:
+            for item in self.source:
+                if self._stop.is_set():
+                    return
+                self._put(out_q, item)
+        finally:
+            self._put(out_q, _DONE)
+
+    def _start_stage(self, name, func, n_workers, in_q, out_q):
+        alive = [n_workers]
+        lock = threading.Lock()
+        emit = lambda item: self._put(out_q, item)
+
+        def work():
+            with profile_thread():
+                consume()
+            with lock:
+                alive[0] -= 1
+                last = alive[0] == 0
+            if last:
+                self._put(out_q, _DONE)
+
+        def consume():
+            while True:
+                item = self._get(in_q)
+                if item is _DONE:
+                    # Leave the marker for the sibling workers
+                    self._put(in_q, _DONE)
+                    break
+                try:
+                    func(item, emit)
+                except Exception as e:
+                    logger.warning(f'Stage {name} failed on {item!r:.80}: {e}')
+
+        for i in range(n_workers):
+            threading.Thread(target=work, name=f'{name}-{i}', daemon=True).start()
+
+    def __iter__(self):
+        queues = [queue.Queue(self.queue_size) for _ in range(len(self.stages) + 1)]
+        threading.Thread(target=self._feed, args=(queues[0],), name='source', daemon=True).start()
+        for (name, func, n_workers), in_q, out_q in zip(self.stages, queues[:-1], queues[1:]):
+            self._start_stage(name, func, n_workers, in_q, out_q)
+
+        try:
+            while True:
+                item = self._get(queues[-1])
+                if item is _DONE:
+                    return
+                yield item
+        finally:
+            self._stop.set()
@@ -0,0 +1,194 @@
+import os
+import re
+import sys
+import time
+import pstats
+import cProfile
+import threading
+from collections import Counter
+from contextlib import contextmanager
+from . import arxiv_logger
+
+logger = arxiv_logger
+
+# Profiler of the current run, picked up by the pipeline worker threads
+_active = None
+
+# (stage, file name pattern, function name pattern), first match wins
+STAGES = [
+    ('ai', r'anthropic|openai|google[/\\]generativeai', r''),
+    ('ai', r'report\.py$', r'^_generate_ai_summary$'),
+    ('fetch', r'requests|urllib3|ssl\.py|socket\.py|http[/\\]client\.py|feedparser', r''),
+    ('fetch', r'arxiv_index_fetch\.py$|fulltext\.py$', r'^fetch_|^_download$'),
+    ('parse', r'bs4|lxml|html[/\\]parser\.py|_markupbase\.py', r''),
+    ('parse', r'arxiv_index_fetch\.py$|report\.py$', r'^parse_'),
+    ('zotero', r'pyzotero|zotero_query\.py$', r''),
+    ('zotero', r'report\.py$', r'^_is_collected$|^_load_zotero$'),
+    ('render', r'report\.py$', r'^_gen_|^_render_|^_write_'),
+    ('wait', r'^~$|queue\.py$|threading\.py$|pipeline\.py$', r'acquire|sleep|wait|^_?get$|^_?put$'),
+]
+
+
+def _write_collapsed(file_path, stacks):
+    with open(file_path, "w", encoding="utf-8") as f:
+        for stack, count in sorted(stacks.items()):
+            f.write(f'{stack} {count}\n')
+
+
+def classify(filename, funcname):
+    for stage, file_pattern, func_pattern in STAGES:
+        if re.search(file_pattern, filename) and re.search(func_pattern, funcname):
+            return stage
+    return 'other'
+
+
+class StackSampler:
+    """
+    Pure-Python sampling profiler.
+
+    Every `interval` seconds the stacks of all threads are recorded, rooted
+    at the thread name, in the collapsed format read by flamegraph.pl and
+    speedscope ("root;caller;callee count").
+    """
+
+    def __init__(self, interval=0.01):
+        self.interval = interval
+        self.stacks = Counter()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _sample(self):
+        own_id = threading.get_ident()
+        names = {t.ident: re.sub(r'-\d+$', '', t.name) for t in threading.enumerate()}
+        for thread_id, frame in sys._current_frames().items():
+            if thread_id == own_id:
+                continue
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f'{os.path.basename(code.co_filename)}:{code.co_name}')
+                frame = frame.f_back
+            stack.append(names.get(thread_id, 'thread'))
+            self.stacks[';'.join(reversed(stack))] += 1
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self._sample()
+
+    def start(self):
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name='sampler', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+
+class RunProfiler:
+    """
+    Profile a whole run, one section per category.
+
+    Each section writes `<name>.pstats` (cProfile of the main thread and of
+    every pipeline worker thread) and, when sampling, `<name>.collapsed`.
+    `finish` writes the same for the whole run and logs the hottest
+    functions of each stage (fetch, parse, zotero, render, ai, and wait
+    for threads blocked on queues or locks).
+
+    Parsing in the process pool is not seen by either profiler, run with
+    `parse_workers=0` to include it.
+    """
+
+    def __init__(self, out_dir, sample_interval=0.01):
+        self.out_dir = out_dir
+        self.sample_interval = sample_interval
+        self._lock = threading.Lock()
+        self._profiles = []
+        self._run_stats = None
+        self._run_stacks = Counter()
+        os.makedirs(out_dir, exist_ok=True)
+
+    def add(self, profile):
+        with self._lock:
+            self._profiles.append(profile)
+
+    @contextmanager
+    def section(self, name):
+        global _active
+        sampler = StackSampler(self.sample_interval) if self.sample_interval else None
+        self._profiles = []
+        main_profile = cProfile.Profile()
+        _active = self
+        if sampler:
+            sampler.start()
+        main_profile.enable()
+        try:
+            yield self
+        finally:
+            main_profile.disable()
+            if sampler:
+                sampler.stop()
+            _active = None
+            self.add(main_profile)
+
+            stats = pstats.Stats(*self._profiles)
+            stats.dump_stats(os.path.join(self.out_dir, f'{name}.pstats'))
+            if self._run_stats is None:
+                self._run_stats = stats
+            else:
+                self._run_stats.add(stats)
+            if sampler:
+                _write_collapsed(os.path.join(self.out_dir, f'{name}.collapsed'), sampler.stacks)
+                self._run_stacks.update(sampler.stacks)
+
+    def hot_functions(self, top=5):
+        """
+        Returns:
+            dict: stage -> (total self time, [(tottime, cumtime, ncalls, 'file:line(function)')])
+        """
+        by_stage = {}
+        for (filename, lineno, funcname), (_, ncalls, tottime, cumtime, _) in self._run_stats.stats.items():
+            by_stage.setdefault(classify(filename, funcname), []).append(
+                (tottime, cumtime, ncalls, f'{os.path.basename(filename)}:{lineno}({funcname})'))
+        return {
+            stage: (sum(f[0] for f in funcs), sorted(funcs, reverse=True)[:top])
+            for stage, funcs in by_stage.items()
+        }
+
+    def finish(self, top=5):
+        if self._run_stats is None:
+            return
+        self._run_stats.dump_stats(os.path.join(self.out_dir, 'run.pstats'))
+        if self._run_stacks:
+            _write_collapsed(os.path.join(self.out_dir, 'run.collapsed'), self._run_stacks)
+
+        for stage, (total, funcs) in sorted(self.hot_functions(top).items()):
+            logger.info(f'[profile] {stage}: {total:.3f}s self time')
+            for tottime, cumtime, ncalls, name in funcs:
+                logger.info(f'[profile]   {tottime:8.3f}s self {cumtime:8.3f}s cum {ncalls:8d} calls  {name}')
+        logger.info(f'[profile] Written to {self.out_dir}')
+
+
+@contextmanager
+def profile_thread():
+    """cProfile the calling worker thread when a run is being profiled"""
+    profiler = _active
+    if profiler is None:
+        yield
+        return
+    profile = cProfile.Profile()
+    try:
+        profile.enable()
+    except ValueError:
+        # Python >= 3.12 allows a single active profiler, which sees all threads
+        yield
+        return
+    try:
+        yield
+    finally:
+        profile.disable()
+        profiler.add(profile)
+
+
+def profile_dir(arxiv_folder):
+    return os.path.join(arxiv_folder, '.profile', time.strftime('%Y%m%d-%H%M%S'))
@@ -1,9 +1,19 @@
 import os
+import re
+import json
+import time
+import queue
+import threading
 from datetime import datetime, timedelta
-from copy import deepcopy
-from .arxiv_index_fetch import query_arxiv_dict,query_arxiv_catchup_dict
+from concurrent.futures import ProcessPoolExecutor
+from .arxiv_index_fetch import (fetch_arxiv_advance, parse_arxiv_advance,
+                                fetch_arxiv_catchup, parse_arxiv_catchup, catchup_subject)
 from .zotero_query import zotero_query
 from .codex import replace_characters, quant_ph
+from .announce_calendar import plan_days, record_empty_day
+from .pipeline import Pipeline
+from .dataview import day_frontmatter, write_paper_stubs, write_month_index
+from .deadline import SummaryCache, prioritize, update_deferred, record_run
 from . import arxiv_logger
 
 logger = arxiv_logger
@@ -19,8 +29,17 @@ def _get_arxiv_url(arxiv_id):
     arxiv_url = f'{root_url}{arg}'
     return arxiv_url
 
-def _generate_ai_summary(title, abstract, provider='gemini'):
-    """Generate AI summary using specified provider"""
+# Characters of full text passed to the AI provider
+FULLTEXT_CHARS = 60000
+
+def _generate_ai_summary(title, abstract, provider='gemini', fulltext=None):
+    """Generate AI summary using specified provider, from the full text when given"""
+
+    fulltext_section = ''
+    if fulltext:
+        fulltext_section = f"""
+                Full text (may be truncated): {fulltext[:FULLTEXT_CHARS]}
+"""
 
     prompt = f"""Summarize this arXiv physics paper (chem-ph / quant-ph) in 2–3 concise sentences, focusing on:
                 1. The central scientific problem and the main contribution of the work.
@@ -30,7 +49,7 @@ def _generate_ai_summary(title, abstract, provider='gemini'):
                 Title: {title}
 
                 Abstract: {abstract}
-
+{fulltext_section}
                 Translate English to Chinese and output only the Chinese text. Provide only the translated summary, no preamble, no commentary, no additional text.
                 """
     
@@ -107,7 +126,18 @@ def _generate_ai_summary(title, abstract, provider='gemini'):
         logger.warning(f"Unknown AI provider: {provider}")
         return None
 
-def _gen_arxiv_markdown(arxiv_id, title, authors, abstract, include_ai_summary=False, ai_provider='gemini'):
+def _ai_summary(title, abstract, provider='gemini', fulltext=None):
+    """(summary, translated title or None), None if the provider failed"""
+    ai_summary = _generate_ai_summary(title, abstract, provider, fulltext)
+    if isinstance(ai_summary, tuple):
+        # gemini also translates the title
+        return ai_summary
+    if ai_summary:
+        return ai_summary, None
+    return None
+
+def _gen_arxiv_markdown(arxiv_id, title, authors, abstract, include_ai_summary=False, ai_provider='gemini', fulltext=None,
+                        summary=None, checked=False):
     arxiv_link_text = '[' + arxiv_id+ ']' + '(' + _get_arxiv_url(arxiv_id) + ')'
     title_text = title
     author_text = ''
@@ -121,9 +151,12 @@ def _gen_arxiv_markdown(arxiv_id, title, authors, abstract, include_ai_summary=F
     ai_summary_section = ''
     title_translate = ''
     if include_ai_summary:
-        ai_summary, ai_title = _generate_ai_summary(title, abstract, ai_provider)
-        if ai_summary:
+        if summary is None:
+            summary = _ai_summary(title, abstract, ai_provider, fulltext)
+        ai_summary, ai_title = summary if summary is not None else (None, None)
+        if ai_title:
             title_translate = f'''Title:  {ai_title}'''
+        if ai_summary:
             ai_summary_section = f'''
 > [!quote]- AI Summary ({ai_provider}):
 > {ai_summary}
@@ -136,7 +169,7 @@ def _gen_arxiv_markdown(arxiv_id, title, authors, abstract, include_ai_summary=F
 
 Links:
 
-- [ ] {arxiv_link_text} 
+- [{'x' if checked else ' '}] {arxiv_link_text} 
 
 Title:  {title_text}
 
@@ -154,50 +187,28 @@ Authors:  {author_text}
     return arxiv_markdown
 
 
-def _gen_data(arxiv_dict, Zot_=None, include_ai_summary=False, ai_provider='gemini'):
-    collect_dict = {}
-    not_collect_dict = {}
-    
-    for _, (arxiv_id, (title, authors, abstract, external_)) in enumerate(arxiv_dict.items()):
-        arxiv_doi = _get_arxiv_doi(arxiv_id)
+def _is_collected(Zot_, arxiv_id, external_):
+    """Whether the paper is in Zotero, by its arXiv DOI or by its journal DOI"""
+    try:
+        query_res = Zot_.query_('DOI', _get_arxiv_doi(arxiv_id))
+    except:
+        query_res = []
+    if query_res.__len__():
+        return True
+    if external_.__len__() == 2:
         try:
-            query_res = Zot_.query_('DOI', arxiv_doi)
+            query_res = Zot_.query_('DOI', external_[0])
         except:
             query_res = []
-        
-        markdown_content = _gen_arxiv_markdown(
-            arxiv_id, title, authors, abstract, include_ai_summary, ai_provider
-        )
-        
-        if query_res.__len__():
-            last_ok = query_res
-            collect_dict[arxiv_id] = markdown_content
-        else:
-            if external_.__len__() == 2:
-                external_doi = external_[0]
-                try:
-                    query_res = Zot_.query_('DOI', external_doi)
-                except:
-                    query_res = []
-                if query_res.__len__():
-                    last_ok = query_res
-                    collect_dict[arxiv_id] = markdown_content
-                else:
-                    not_collect_dict[arxiv_id] = markdown_content
-            else:
-                not_collect_dict[arxiv_id] = markdown_content
-    return collect_dict, not_collect_dict
-
-
-def _gen_oneday_markdown(date_string, oneday_arxiv_dict, Zot_, old_data=None, include_ai_summary=False, ai_provider='gemini'):
-
-    oneday_arxiv_dict = deepcopy(oneday_arxiv_dict)
-    category = oneday_arxiv_dict['category']
-    del oneday_arxiv_dict['category']
-    collect_dict, not_collect_dict = _gen_data(oneday_arxiv_dict, Zot_, include_ai_summary, ai_provider)
-
-    new_data = []
-    date_markdown = f'# {date_string} preprint by arxiv_tools\n\nThere are a total of {oneday_arxiv_dict.__len__()} articles today.\n\n'
+        return query_res.__len__() > 0
+    return False
+
+
+def _render_oneday_markdown(date_string, category, collect_dict, not_collect_dict, old_data=None, watched=None,
+                            old_updated=(), checked_links=()):
+
+    new_data = [key for key in old_updated if key in collect_dict or key in not_collect_dict]
+    date_markdown = f'# {date_string} preprint by arxiv_tools\n\nThere are a total of {collect_dict.__len__() + not_collect_dict.__len__()} articles today.\n\n'
     date_markdown +=  f'''
 ---
 tags:
@@ -214,12 +225,20 @@ WHERE completed
 ```
 
 '''
+    if watched:
+        # Pinned on top, linking to the full entries below
+        date_markdown += '## watched authors\n\n'
+        for key in sorted(watched):
+            mark = 'x' if ('watched authors', key) in checked_links else ' '
+            date_markdown += f'- [{mark}] [[#{key}]] {"; ".join(watched[key])}\n'
+        date_markdown += '\n'
+
     date_markdown += '## collected\n\n'
     for key in sorted([key for key in collect_dict]):
         value = collect_dict[key]
         date_markdown += value
         if old_data is not None:
-            if key not in old_data:
+            if key not in old_data and key not in new_data:
                 new_data.append(key)
 
     date_markdown += '## not collected\n\n'
@@ -228,41 +247,454 @@ WHERE completed
         value = not_collect_dict[key]
         date_markdown += value
         if old_data is not None:
-            if key not in old_data:
+            if key not in old_data and key not in new_data:
                 new_data.append(key)
             
     if new_data.__len__(): 
         date_markdown += '## update \n\n'
 
         for key in sorted([key for key in new_data]):
-            value = f'- [ ] [[#{key}]]\n'
+            mark = 'x' if ('update', key) in checked_links else ' '
+            value = f'- [{mark}] [[#{key}]]\n'
             date_markdown += value
         
     return date_markdown
 
-def parse_old_report(file_path):
-    if os.path.exists(file_path):
-        
-        with open(
-                file_path, 
-                "r", encoding="utf-8"
-            ) as f:
-            lines = f.readlines()
-        old_title_lines = []
-        for line in lines:
-            if line.startswith('### arXiv:'):
-                arxiv_id_str = line[4:-1].strip()
-                old_title_lines.append(arxiv_id_str)
+def parse_day_report(file_path):
+    """
+    Read back everything a day report holds.
+
+    Returns:
+        dict: date, category, papers, updated (arXiv ids listed in the
+              update section), watched (arXiv id -> watched authors) and
+              checked_links ([section, arXiv id] of the checked items in the
+              update and watched sections). Each paper has arxiv_id, title, title_translated,
+              authors, abstract, ai_summary, ai_provider, collected and checked.
+              None if the file does not exist.
+    """
+    if not os.path.exists(file_path):
+        return None
+    with open(file_path, "r", encoding="utf-8") as f:
+        lines = f.read().split('\n')
+
+    report = {'date': None, 'category': None, 'papers': [], 'updated': [], 'watched': {}, 'checked_links': []}
+    section = None
+    paper = None
+    block = None
+    for line in lines:
+        if block is not None:
+            if line.strip():
+                text = line[2:] if line.startswith('> ') else line
+                paper[block] = f'{paper[block]} {text}'.strip()
+                continue
+            block = None
+
+        if line.startswith('## '):
+            section = line[3:].strip()
+            paper = None
+        elif line.startswith('  - #') and report['date'] is None:
+            tag = line[5:].strip()
+            report['category'], report['date'] = tag[:-11], tag[-10:]
+        elif line.startswith('### arXiv:'):
+            paper = {
+                'arxiv_id': line[4:].strip(),
+                'title': '',
+                'title_translated': '',
+                'authors': [],
+                'abstract': '',
+                'ai_summary': '',
+                'ai_provider': None,
+                'collected': section == 'collected',
+                'checked': False,
+            }
+            report['papers'].append(paper)
+        elif section == 'update' and line.startswith('- ['):
+            arxiv_id = line[9:].split(']]')[0].strip()
+            report['updated'].append(arxiv_id)
             if line.startswith('- [x]'):
-                arxiv_id_str = line[8:-2].strip()
-                old_title_lines.append(arxiv_id_str)
-            
-        return old_title_lines
-    else:
+                report['checked_links'].append([section, arxiv_id])
+        elif section == 'watched authors' and line.startswith('- ['):
+            arxiv_id, _, names = line[9:].partition(']]')
+            report['watched'][arxiv_id.strip()] = [n.strip() for n in names.split('; ') if n.strip()]
+            if line.startswith('- [x]'):
+                report['checked_links'].append([section, arxiv_id.strip()])
+        elif paper is not None:
+            if line.startswith('- [x] [arXiv:'):
+                paper['checked'] = True
+            elif line.startswith('Title:  '):
+                key = 'title_translated' if paper['title'] else 'title'
+                paper[key] = line[8:].strip()
+            elif line.startswith('Authors:  '):
+                paper['authors'] = [a.strip() for a in line[10:].split(', ') if a.strip()]
+            elif line.startswith('> [!quote]- AI Summary'):
+                block = 'ai_summary'
+                if line.startswith('> [!quote]- AI Summary ('):
+                    paper['ai_provider'] = line[24:].split(')')[0]
+            elif line.startswith('> [!quote]- Abstract'):
+                block = 'abstract'
+
+    for paper in report['papers']:
+        for key in replace_characters:
+            paper['abstract'] = paper['abstract'].replace(replace_characters[key], key)
+    return report
+
+def parse_old_report(file_path):
+    """
+    arXiv ids of an existing day report, see `parse_day_report` for the rest.
+
+    Returns:
+        list: arXiv ids, None if the file does not exist
+    """
+    report = parse_day_report(file_path)
+    if report is None:
         return None
-        
+    return [paper['arxiv_id'] for paper in report['papers']]
+
+def _load_zotero():
+    try:
+        Zot_ = zotero_query() # default local use
+        Zot_.get_everything()
+    except:
+        Zot_ = None
+    return Zot_
+
+
+def iter_papers(year: int, month: int, md_folder=None, query_args: dict=quant_ph, category='quant-ph',
+                include_ai_summary=False, ai_provider='gemini', specific_day=None, use_url='catchup',
+                Zot_=None, fetch_workers=2, parse_workers=2, summary_workers=4, queue_size=8,
+                fulltext_cache=None, fulltext_kind='pdf', fulltext_top_n=0, fulltext_workers=4,
+                watchlist=None, summary_cache=None, summarize_new=True):
+    """
+    Stream paper records as soon as they are ready.
+
+    Fetch, parse, Zotero matching and markdown rendering run as separate
+    stages connected by bounded queues, so the network, the parser and the
+    AI provider work at the same time. Parsing runs in a process pool
+    (`parse_workers=0` parses on a thread instead).
+
+    Args:
+        year, month, specific_day, query_args, category, include_ai_summary,
+        ai_provider, use_url: as in `filter_arxiv_to_md`
+        md_folder: Category folder, used for the learned announcement calendar
+        Zot_: Loaded `zotero_query`, the local library is loaded if None
+        fetch_workers: Concurrent arXiv requests
+        parse_workers: Parser processes
+        summary_workers: Concurrent markdown / AI summary workers
+        queue_size: Capacity of each queue between stages
+        fulltext_cache: `FulltextCache`; if set with include_ai_summary, the
+            summaries of not collected papers are built from their full text
+        fulltext_kind: 'pdf' or 'source'
+        fulltext_top_n: Only the first N not collected papers of each day get
+            their full text, 0 means all of them
+        fulltext_workers: Concurrent full text downloads
+        watchlist: `Watchlist` of authors to flag
+        summary_cache: `SummaryCache`, summaries found there are reused and
+            new ones are stored
+        summarize_new: If False, only cached summaries are used and the AI
+            provider is not called
+
+    Yields:
+        dict: date, category, arxiv_id, title, authors, abstract, external,
+              collected, markdown, day_total (number of papers that day)
+              fulltext (None unless downloaded), watched (matched authors)
+              and summary ((summary, translated title) or None)
+    """
+    if Zot_ is None:
+        Zot_ = _load_zotero()
+    days = [(year, month, day) for day in plan_days(year, month, md_folder, specific_day, use_url)]
+    parse_fn = parse_arxiv_advance if use_url == 'advance' else parse_arxiv_catchup
+    parse_pool = ProcessPoolExecutor(parse_workers) if parse_workers > 0 else None
+
+    def fetch(day, emit):
+        date_string = f'{day[0]}-{day[1]:02}-{day[2]:02}'
+        if use_url == 'advance':
+            d = datetime.strptime(date_string, "%Y-%m-%d")
+            date_to_date = (d + timedelta(days=1)).strftime("%Y-%m-%d")
+            raw = fetch_arxiv_advance(date_string, date_to_date, query_args) # Use advance search url
+        else:
+            raw = fetch_arxiv_catchup(catchup_subject(query_args), date_string) # Use catchup url
+        if raw is not None:
+            emit((date_string, raw))
+
+    def parse(page, emit):
+        date_string, raw = page
+        if parse_pool is None:
+            arxiv_dict = parse_fn(raw)
+        else:
+            arxiv_dict = parse_pool.submit(parse_fn, raw).result()
+
+        if not arxiv_dict.__len__():
+            if md_folder is not None:
+                record_empty_day(md_folder, date_string)
+            # Only log if we're processing a specific day (avoid spam for whole month)
+            if specific_day is not None:
+                logger.info(f'No papers found for {date_string}')
+            return
+
+        logger.info(f'Processing {date_string}, total num: {arxiv_dict.__len__()}')
+        for arxiv_id, (title, authors, abstract, external_) in arxiv_dict.items():
+            emit({
+                'date': date_string,
+                'category': category,
+                'arxiv_id': arxiv_id,
+                'title': title,
+                'authors': authors,
+                'abstract': abstract,
+                'external': external_,
+                'day_total': arxiv_dict.__len__(),
+            })
+
+    def match(paper, emit):
+        paper['collected'] = _is_collected(Zot_, paper['arxiv_id'], paper['external'])
+        paper['watched'] = watchlist.match(paper['authors']) if watchlist is not None else []
+        emit(paper)
+
+    fulltext_counts = {}
+    fulltext_lock = threading.Lock()
+
+    def read_fulltext(paper, emit):
+        paper['fulltext'] = None
+        if not paper['collected']:
+            with fulltext_lock:
+                n = fulltext_counts.get(paper['date'], 0)
+                wanted = fulltext_top_n <= 0 or n < fulltext_top_n
+                if wanted:
+                    fulltext_counts[paper['date']] = n + 1
+            if wanted:
+                paper['fulltext'] = fulltext_cache.get_text(paper['arxiv_id'], fulltext_kind)
+        emit(paper)
+
+    def summarize(paper, emit):
+        summary, provider = None, ai_provider
+        if include_ai_summary:
+            cached = summary_cache.get(paper['arxiv_id']) if summary_cache is not None else None
+            if cached is not None:
+                summary, provider = cached[:2], cached[2]
+            elif summarize_new:
+                try:
+                    summary = _ai_summary(paper['title'], paper['abstract'], ai_provider, paper.get('fulltext'))
+                except Exception as e:
+                    logger.warning(f"Failed to summarize {paper['arxiv_id']}: {e}")
+                if summary is not None and summary_cache is not None:
+                    summary_cache.put(paper['arxiv_id'], *summary, ai_provider)
+        paper['summary'] = summary
+        paper['provider'] = provider
+        paper['markdown'] = _paper_markdown(paper, summary, provider)
+        emit(paper)
+
+    pipe = Pipeline(days, queue_size)
+    pipe.add_stage('fetch', fetch, fetch_workers)
+    pipe.add_stage('parse', parse, max(1, parse_workers))
+    pipe.add_stage('match', match, 1)
+    if include_ai_summary and summarize_new and fulltext_cache is not None:
+        pipe.add_stage('fulltext', read_fulltext, fulltext_workers)
+    pipe.add_stage('summarize', summarize, summary_workers if include_ai_summary and summarize_new else 1)
+    try:
+        yield from pipe
+    finally:
+        if parse_pool is not None:
+            parse_pool.shutdown()
+
+
+def _paper_markdown(paper, summary=None, ai_provider='gemini'):
+    return _gen_arxiv_markdown(paper['arxiv_id'], paper['title'], paper['authors'], paper['abstract'],
+                               summary is not None, ai_provider, summary=summary,
+                               checked=paper.get('checked', False))
+
+
+def _carry_over(papers, old_report, ai_provider='gemini'):
+    """
+    Keep what the reader and earlier runs added to a day report that is rewritten:
+    checked items, and AI summaries this run did not produce.
+    """
+    old_papers = {p['arxiv_id']: p for p in old_report['papers']}
+    for paper in papers:
+        old = old_papers.get(paper['arxiv_id'])
+        if old is None:
+            continue
+        changed = old['checked'] != paper.get('checked', False)
+        paper['checked'] = old['checked']
+        if paper['summary'] is None and old['ai_summary']:
+            paper['summary'] = (old['ai_summary'], old['title_translated'] or None)
+            paper['provider'] = old['ai_provider'] or ai_provider
+            changed = True
+        if changed:
+            paper['markdown'] = _paper_markdown(paper, paper['summary'], paper.get('provider', ai_provider))
+
+
+def _day_report_file(md_folder, date_string):
+    year, month, day = date_string.split('-')
+    return os.path.join(md_folder, year, month, f'{day}.md')
+
+
+_day_report_path = re.compile(r'(\d{4})[\\/](\d{2})[\\/](\d{2})\.md')
+
+
+def iter_day_reports(md_folder, year=None, month=None):
+    """
+    Day reports of a category folder, the files `<md_folder>/YYYY/MM/DD.md`.
+
+    Args:
+        year, month: Only walk this year (and month)
+
+    Yields:
+        tuple: ('YYYY-MM-DD', file path), sorted by date
+    """
+    root = md_folder
+    if year is not None:
+        root = os.path.join(root, f'{year}')
+        if month is not None:
+            root = os.path.join(root, f'{month:02}')
+    found = []
+    for folder, dirs, files in os.walk(root):
+        # Skip digests/, index/, papers/... and anything below the month folders
+        depth = os.path.relpath(folder, md_folder).count(os.sep) + 1 if folder != md_folder else 0
+        dirs[:] = [d for d in dirs if d.isdigit() and depth < 2]
+        for name in files:
+            file_path = os.path.join(folder, name)
+            m = _day_report_path.fullmatch(os.path.relpath(file_path, md_folder))
+            if m:
+                found.append(('-'.join(m.groups()), file_path))
+    yield from sorted(found)
+
+
+def load_state(file_path, default):
+    """
+    Read a JSON state file (.calendar.json, .revisit.json, .rollup.json...).
+
+    Returns:
+        The decoded JSON, or `default` if the file is missing or unreadable
+    """
+    if not os.path.exists(file_path):
+        return default
+    try:
+        with open(file_path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError) as e:
+        logger.warning(f'Failed to read {file_path}, starting from scratch: {e}')
+        return default
+
+
+def _write_day_report(md_folder, category, date_string, papers, layout='default', old_report=None):
+    """
+    Write one day report from the records of `iter_papers`.
+
+    `old_report` is the `parse_day_report` of the report before this run:
+    papers missing from it are added to its update section, and the checked
+    items of the update and watched sections are kept.
+    """
+    oneday_report_file = _day_report_file(md_folder, date_string)
+    os.makedirs(os.path.dirname(oneday_report_file), exist_ok=True)
+
+    collect_dict = {}
+    not_collect_dict = {}
+    watched = {paper['arxiv_id']: paper['watched'] for paper in papers if paper.get('watched')}
+    for paper in papers:
+        if paper['collected']:
+            collect_dict[paper['arxiv_id']] = paper['markdown']
+        else:
+            not_collect_dict[paper['arxiv_id']] = paper['markdown']
+
+    old_data, old_updated, checked_links = None, (), set()
+    if old_report is not None:
+        old_data = [p['arxiv_id'] for p in old_report['papers']]
+        old_updated = old_report['updated']
+        checked_links = {tuple(link) for link in old_report['checked_links']}
+    markdown_str = _render_oneday_markdown(
+        date_string, category, collect_dict, not_collect_dict, old_data, watched,
+        old_updated, checked_links
+    )
+    if layout != 'default':
+        markdown_str = day_frontmatter(date_string, category, papers) + markdown_str
+    if layout == 'stubs':
+        write_paper_stubs(md_folder, category, date_string, papers)
+
+    with open(
+        oneday_report_file, 
+        "w", encoding="utf-8"
+    ) as f:
+        f.write(markdown_str)
+    return oneday_report_file
+
+
+def _summarize_until(days, deadline, ai_provider, summary_workers, summary_cache,
+                     fulltext_cache=None, fulltext_kind='pdf', fulltext_top_n=0):
+    """
+    Add AI summaries to the papers of `days` in priority order until `deadline`.
+    Full texts are read for the same papers as in `iter_papers`: the first
+    `fulltext_top_n` not collected papers of each day.
+
+    Calls run on daemon threads. Those still running at the deadline are
+    abandoned and their results discarded, so the papers are deferred and
+    the process can exit without waiting for the provider.
+
+    Returns:
+        set: Dates whose papers got new summaries
+    """
+    candidates = iter(prioritize([p for papers, _ in days.values() for p in papers if p['summary'] is None]))
+    results = queue.Queue()
+    with_fulltext = set()
+    if fulltext_cache is not None:
+        for papers, _ in days.values():
+            not_collected = [p['arxiv_id'] for p in papers if not p['collected']]
+            with_fulltext.update(not_collected[:fulltext_top_n] if fulltext_top_n > 0 else not_collected)
+
+    def summarize(paper):
+        try:
+            fulltext = None
+            if paper['arxiv_id'] in with_fulltext:
+                fulltext = fulltext_cache.get_text(paper['arxiv_id'], fulltext_kind)
+            results.put((paper, _ai_summary(paper['title'], paper['abstract'], ai_provider, fulltext)))
+        except Exception as e:
+            logger.warning(f"Failed to summarize {paper['arxiv_id']}: {e}")
+            results.put((paper, None))
+
+    changed = set()
+    running = 0
+    while True:
+        while running < summary_workers and time.time() < deadline:
+            paper = next(candidates, None)
+            if paper is None:
+                break
+            threading.Thread(target=summarize, args=(paper,), name='summarize', daemon=True).start()
+            running += 1
+        if not running:
+            break
+        try:
+            paper, summary = results.get(timeout=max(0, deadline - time.time()))
+        except queue.Empty:
+            logger.warning(f'Deadline reached with {running} AI summaries in flight')
+            break
+        running -= 1
+        if summary is not None:
+            summary_cache.put(paper['arxiv_id'], *summary, ai_provider)
+            paper['summary'] = summary
+            paper['provider'] = ai_provider
+            paper['markdown'] = _paper_markdown(paper, summary, ai_provider)
+            changed.add(paper['date'])
+    return changed
+
+
+def _old_reports(md_folder, year, month, specific_day=None):
+    """
+    Returns:
+        dict: 'YYYY-MM-DD' -> `parse_day_report` of the existing day reports of the month
+    """
+    reports = {}
+    for date_string, file_path in iter_day_reports(md_folder, year, month):
+        if specific_day is not None and int(date_string[8:]) != specific_day:
+            continue
+        report = parse_day_report(file_path)
+        if report is not None:
+            reports[date_string] = report
+    return reports
+
+
 def filter_arxiv_to_md(year: int, month: int, md_folder: str, query_args: dict=quant_ph, 
-                       category='quant-ph', include_ai_summary=False, ai_provider='gemini', specific_day=None, use_url='catchup'):
+                       category='quant-ph', include_ai_summary=False, ai_provider='gemini', specific_day=None, use_url='catchup',
+                       fetch_workers=2, parse_workers=2, summary_workers=4,
+                       fulltext_cache=None, fulltext_kind='pdf', fulltext_top_n=0, watchlist=None,
+                       layout='default', summary_cache=None, deadline=None, Zot_=None):
     """
     Fetch arXiv papers and generate markdown reports
     
@@ -275,55 +707,86 @@ def filter_arxiv_to_md(year: int, month: int, md_folder: str, query_args: dict=q
         include_ai_summary: Whether to generate AI summaries
         ai_provider: AI provider to use (claude/openai/gemini)
         specific_day: If set, only fetch this specific day (1-31). If None, fetch all days in month
+        use_url: 'catchup' or 'advance'
+        fetch_workers, parse_workers, summary_workers: see `iter_papers`
+        fulltext_cache, fulltext_kind, fulltext_top_n: see `iter_papers`
+        watchlist: `Watchlist`, papers of watched authors are pinned on top of the day report
+        layout: 'default', 'frontmatter' (YAML arrays of ids and collected ids on
+            each day report, plus monthly index notes) or 'stubs' (frontmatter
+            and one metadata note per paper)
+        summary_cache: `SummaryCache`, by default the one in `md_folder`
+        deadline: Epoch time. The plain reports are written first, then AI
+            summaries are added in priority order (watched authors, not
+            collected, newest) until the deadline; the rest is deferred
+        Zot_: Loaded `zotero_query`, the local library is loaded if None
+
+    Returns:
+        list: Day report files that were written
     """
-    try:
-        Zot_ = zotero_query() # default local use
-        Zot_.get_everything()
-    except:
-        Zot_ = None
-    root_dir = md_folder
-    
-    # Determine which days to process
-    if specific_day is not None:
-        # Process only the specific day
-        days_to_process = [specific_day]
-    else:
-        # Process all days in the month (1-31)
-        days_to_process = range(1, 32)
-    
-    for day in days_to_process:
-        date_from_date = f'{year}-{month:02}-{day:02}'
-        
-        if use_url == 'advance':
-            d = datetime.strptime(date_from_date, "%Y-%m-%d")
-            date_to_date = (d + timedelta(days=1)).strftime("%Y-%m-%d")
-            arxiv_dict = query_arxiv_dict(date_from_date, date_to_date, query_args) # Use advance search url
+    started = time.time()
+    old_reports = _old_reports(md_folder, year, month, specific_day)
+    if include_ai_summary:
+        if summary_cache is None:
+            summary_cache = SummaryCache(md_folder)
+        # Reports written before the cache existed hold summaries it does not know yet
+        for old_report in old_reports.values():
+            for p in old_report['papers']:
+                if p['ai_summary'] and summary_cache.get(p['arxiv_id']) is None:
+                    summary_cache.put(p['arxiv_id'], p['ai_summary'], p['title_translated'] or None,
+                                      p['ai_provider'] or ai_provider)
+
+    # A day is written as soon as all of its papers came out of the pipeline
+    pending = {}
+    days = {}
+    written = []
+    for paper in iter_papers(year, month, md_folder, query_args, category, include_ai_summary,
+                             ai_provider, specific_day, use_url, Zot_=Zot_, fetch_workers=fetch_workers,
+                             parse_workers=parse_workers, summary_workers=summary_workers,
+                             fulltext_cache=fulltext_cache, fulltext_kind=fulltext_kind,
+                             fulltext_top_n=fulltext_top_n, watchlist=watchlist,
+                             summary_cache=summary_cache, summarize_new=deadline is None):
+        papers = pending.setdefault(paper['date'], [])
+        papers.append(paper)
+        if papers.__len__() == paper['day_total']:
+            date_string = paper['date']
+            papers = pending.pop(date_string)
+            old_report = old_reports.get(date_string)
+            if old_report is not None:
+                _carry_over(papers, old_report, ai_provider)
+            days[date_string] = (papers, old_report)
+            written.append(_write_day_report(md_folder, category, date_string,
+                                             papers, layout, old_report))
+
+    for date_string, papers in pending.items():
+        logger.warning(f'Skip writing {date_string}: only {papers.__len__()} of '
+                       f"{papers[0]['day_total']} papers were processed")
 
-        elif use_url == 'catchup':
-            arxiv_dict = query_arxiv_catchup_dict(date=date_from_date, query_args=query_args) # Use catchup url
-        
-        if arxiv_dict.__len__():
-            arxiv_dict['category'] = category
-            # print(arxiv_dict)
-            logger.info(f'{arxiv_dict.__len__() - 1}')
-            year_dir = os.path.join(root_dir, f'{year}')
-            month_dir = os.path.join(year_dir, f'{month:02}')
-            os.makedirs(month_dir, exist_ok=True)
-            date_string = f'{year}-{month:02}-{day:02}'
-            logger.info(f'Processing {date_from_date}, total num: {arxiv_dict.__len__()} -1 ')
-            oneday_report_file = os.path.join(month_dir, f'{day:02}.md')
-            parse_old = parse_old_report(oneday_report_file)
-            
-            markdown_str = _gen_oneday_markdown(
-                date_string, arxiv_dict, Zot_, parse_old, include_ai_summary, ai_provider
-            )
-            
-            with open(
-                oneday_report_file, 
-                "w", encoding="utf-8"
-            ) as f:
-                f.write(markdown_str)
-        else:
-            # Only log if we're processing a specific day (avoid spam for whole month)
-            if specific_day is not None:
-                logger.info(f'No papers found for {date_from_date}')
\ No newline at end of file
+    if include_ai_summary:
+        if deadline is not None:
+            for date_string in _summarize_until(days, deadline, ai_provider, summary_workers, summary_cache,
+                                                fulltext_cache, fulltext_kind, fulltext_top_n):
+                papers, old_report = days[date_string]
+                _write_day_report(md_folder, category, date_string, papers, layout, old_report)
+
+        deferred = {
+            date_string: [p['arxiv_id'] for p in papers if p['summary'] is None]
+            for date_string, (papers, _) in days.items()
+        }
+        update_deferred(md_folder, deferred)
+        summary_cache.save()
+        n_deferred = sum(ids.__len__() for ids in deferred.values())
+        record_run(md_folder, {
+            'started': datetime.fromtimestamp(started).isoformat(timespec='seconds'),
+            'finished': datetime.now().isoformat(timespec='seconds'),
+            'deadline': datetime.fromtimestamp(deadline).isoformat(timespec='seconds') if deadline else None,
+            'days': sorted(days),
+            'papers': sum(papers.__len__() for papers, _ in days.values()),
+            'deferred': {d: ids for d, ids in deferred.items() if ids},
+        })
+        if n_deferred:
+            logger.info(f'{n_deferred} AI summaries deferred to a later top-up run')
+
+    if layout != 'default':
+        for year_month in sorted({tuple(f.split(os.sep)[-3:-1]) for f in written}):
+            write_month_index(md_folder, category, *year_month)
+    return written
@@ -0,0 +1,164 @@
+import os
+import json
+from datetime import date
+from .report import filter_arxiv_to_md, iter_day_reports, load_state, _load_zotero
+from .codex import quant_ph
+from . import arxiv_logger
+
+logger = arxiv_logger
+
+REVISIT_FILE = '.revisit.json'
+
+# (max age in days, revisit interval in days)
+REVISIT_INTERVALS = [
+    (7, 1),     # last week: daily
+    (90, 7),    # last quarter: weekly
+]
+OLD_INTERVAL = 30  # monthly after that
+
+
+def revisit_interval(age):
+    for max_age, interval in REVISIT_INTERVALS:
+        if age <= max_age:
+            return interval
+    return OLD_INTERVAL
+
+
+def _load_state(md_folder):
+    return load_state(os.path.join(md_folder, REVISIT_FILE), {})
+
+
+def _save_state(md_folder, state):
+    with open(os.path.join(md_folder, REVISIT_FILE), "w", encoding="utf-8") as f:
+        json.dump(state, f, indent=1, sort_keys=True)
+
+
+def _report_days(md_folder):
+    """All dates that already have a day report, as date objects"""
+    days = []
+    for date_string, _ in iter_day_reports(md_folder):
+        try:
+            days.append(date.fromisoformat(date_string))
+        except ValueError:
+            continue
+    return days
+
+
+def _report_file(md_folder, day):
+    return os.path.join(md_folder, f'{day.year}', f'{day.month:02}', f'{day.day:02}.md')
+
+
+def _snapshot(file_path):
+    """
+    (collected ids, not collected ids) of a day report.
+    """
+    collected, not_collected = set(), set()
+    if not os.path.exists(file_path):
+        return collected, not_collected
+    section = None
+    with open(file_path, "r", encoding="utf-8") as f:
+        for line in f:
+            if line.startswith('## '):
+                section = line[3:].strip()
+            elif line.startswith('### arXiv:'):
+                arxiv_id = line[4:].strip()
+                if section == 'collected':
+                    collected.add(arxiv_id)
+                else:
+                    not_collected.add(arxiv_id)
+    return collected, not_collected
+
+
+def plan_revisits(md_folder, budget, today=None):
+    """
+    Pick the past days most likely to have drifted.
+
+    Each day has a revisit interval that decays with its age. Days that are
+    due are ranked by how overdue they are times their observed drift rate
+    (changes / checks, with a +1/+2 prior so unseen days still get visited).
+
+    Returns:
+        list: dates to refetch, at most `budget` of them
+    """
+    today = today or date.today()
+    state = _load_state(md_folder)
+    scored = []
+    for day in _report_days(md_folder):
+        age = (today - day).days
+        if age <= 0:
+            continue
+        stats = state.get(day.isoformat(), {})
+        if 'last_checked' in stats:
+            since = (today - date.fromisoformat(stats['last_checked'])).days
+        else:
+            since = age
+        interval = revisit_interval(age)
+        if since < interval:
+            continue
+        drift_rate = (stats.get('changes', 0) + 1) / (stats.get('checks', 0) + 2)
+        scored.append((since / interval * drift_rate, day))
+    scored.sort(key=lambda x: (x[0], x[1]), reverse=True)
+    return [day for _, day in scored[:budget]]
+
+
+def revisit(md_folder, budget, query_args=quant_ph, category='quant-ph', use_url='catchup', today=None,
+            **filter_options):
+    """
+    Refetch up to `budget` past days and fold the results into their reports.
+
+    Args:
+        md_folder: Category folder holding the day reports
+        budget: Maximum number of days (arXiv requests) to spend
+        query_args: Query arguments for arXiv API
+        category: ArXiv category
+        use_url: 'catchup' or 'advance'
+        filter_options: Passed on to `filter_arxiv_to_md` (AI summary, workers, watchlist,
+            Zot_...). The Zotero library is loaded once for all days if no `Zot_` is given
+
+    Returns:
+        dict: number of days checked, days changed, new papers and newly collected papers
+    """
+    today = today or date.today()
+    state = _load_state(md_folder)
+    found = {'checked': 0, 'changed': 0, 'new': 0, 'collected': 0}
+
+    plan = plan_revisits(md_folder, budget, today)
+    if plan and filter_options.get('Zot_') is None:
+        filter_options['Zot_'] = _load_zotero()
+
+    for day in plan:
+        file_path = _report_file(md_folder, day)
+        old_collected, old_not_collected = _snapshot(file_path)
+
+        filter_arxiv_to_md(
+            year=day.year,
+            month=day.month,
+            md_folder=md_folder,
+            query_args=query_args,
+            category=category,
+            specific_day=day.day,
+            use_url=use_url,
+            **filter_options
+        )
+
+        new_collected, new_not_collected = _snapshot(file_path)
+        n_new = len((new_collected | new_not_collected) - (old_collected | old_not_collected))
+        n_collected = len(new_collected - old_collected)
+
+        stats = state.setdefault(day.isoformat(), {'checks': 0, 'changes': 0})
+        stats['checks'] += 1
+        stats['last_checked'] = today.isoformat()
+        found['checked'] += 1
+        if n_new or n_collected:
+            stats['changes'] += 1
+            stats['last_changed'] = today.isoformat()
+            found['changed'] += 1
+            found['new'] += n_new
+            found['collected'] += n_collected
+            logger.info(f'Revisit {category} {day}: {n_new} new, {n_collected} newly collected')
+
+    _save_state(md_folder, state)
+    logger.info(f"Revisit {category}: checked {found['checked']} days, "
+                f"{found['changed']} changed, {found['new']} new papers, "
+                f"{found['collected']} newly collected")
+    return found
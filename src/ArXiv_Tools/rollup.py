@@ -0,0 +1,180 @@
+import os
+import re
+import json
+from datetime import date
+from .report import parse_day_report, iter_day_reports, load_state, _day_report_file, _get_arxiv_url
+from . import arxiv_logger
+
+logger = arxiv_logger
+
+ROLLUP_FILE = '.rollup.json'
+DIGEST_DIR = 'digests'
+
+_columns = ['total', 'collected', 'checked', 'watched', 'updated']
+
+
+def _load_state(md_folder):
+    return load_state(os.path.join(md_folder, ROLLUP_FILE), {'days': {}})
+
+
+def _save_state(md_folder, state):
+    with open(os.path.join(md_folder, ROLLUP_FILE), "w", encoding="utf-8") as f:
+        json.dump(state, f, sort_keys=True)
+
+
+def _day_stats(file_path):
+    """Counts and watched/updated papers of one day report"""
+    report = parse_day_report(file_path)
+    if report is None:
+        return None
+    st = os.stat(file_path)
+    return {
+        'stamp': [st.st_mtime, st.st_size],
+        'total': report['papers'].__len__(),
+        'collected': sum(p['collected'] for p in report['papers']),
+        'checked': sum(p['checked'] for p in report['papers']),
+        'watched': report['watched'],
+        'updated': report['updated'],
+    }
+
+
+def _digest_keys(date_string):
+    d = date.fromisoformat(date_string)
+    iso_year, iso_week, _ = d.isocalendar()
+    return [f'{iso_year}-W{iso_week:02}', f'{d.year}-{d.month:02}', f'{d.year}']
+
+
+def _count(stats, column):
+    value = stats[column]
+    return value if isinstance(value, int) else value.__len__()
+
+
+def _ratio(collected, total):
+    return f'{collected / total:.0%}' if total else '-'
+
+
+def _render_digest(category, key, days):
+    """
+    Args:
+        days: [(date_string, stats)] belonging to the digest, sorted
+    """
+    totals = {c: sum(_count(s, c) for _, s in days) for c in _columns}
+    yearly = re.fullmatch(r'\d{4}', key) is not None
+
+    lines = [
+        '---',
+        f'category: {category}',
+        f'period: {key}',
+        f"days: {days.__len__()}",
+    ]
+    lines += [f'{c}: {totals[c]}' for c in _columns]
+    lines += [
+        '---',
+        '',
+        f'# {category} {key} digest',
+        '',
+        f"{totals['total']} articles, {totals['collected']} collected "
+        f"({_ratio(totals['collected'], totals['total'])}), {totals['checked']} checked.",
+        '',
+    ]
+
+    if yearly:
+        # One row per month, the monthly digests hold the days
+        rows = {}
+        for date_string, stats in days:
+            month = date_string[:7]
+            row = rows.setdefault(month, dict.fromkeys(_columns, 0))
+            for c in _columns:
+                row[c] += _count(stats, c)
+        lines += ['| month | papers | collected | ratio | checked | watched | updated |',
+                  '|---|---|---|---|---|---|---|']
+        for month, row in sorted(rows.items()):
+            lines.append(f"| [{month}]({month}.md) | {row['total']} | {row['collected']} | "
+                         f"{_ratio(row['collected'], row['total'])} | {row['checked']} | "
+                         f"{row['watched']} | {row['updated']} |")
+    else:
+        lines += ['| day | papers | collected | ratio | checked | watched | updated |',
+                  '|---|---|---|---|---|---|---|']
+        for date_string, stats in days:
+            link = f"../{date_string[:4]}/{date_string[5:7]}/{date_string[8:]}.md"
+            lines.append(f"| [{date_string}]({link}) | {stats['total']} | {stats['collected']} | "
+                         f"{_ratio(stats['collected'], stats['total'])} | {stats['checked']} | "
+                         f"{stats['watched'].__len__()} | {stats['updated'].__len__()} |")
+
+    watched = [(d, arxiv_id, names) for d, s in days for arxiv_id, names in sorted(s['watched'].items())]
+    if watched:
+        lines += ['', '## watched authors', '']
+        for date_string, arxiv_id, names in watched:
+            lines.append(f'- [{arxiv_id}]({_get_arxiv_url(arxiv_id)}) {date_string} {"; ".join(names)}')
+
+    updated = [(d, arxiv_id) for d, s in days for arxiv_id in s['updated']]
+    if updated and not yearly:
+        lines += ['', '## update', '']
+        for date_string, arxiv_id in updated:
+            lines.append(f'- [{arxiv_id}]({_get_arxiv_url(arxiv_id)}) {date_string}')
+
+    return '\n'.join(lines) + '\n'
+
+
+def _write_digests(md_folder, state, keys):
+    category = os.path.basename(os.path.normpath(md_folder))
+    digest_dir = os.path.join(md_folder, DIGEST_DIR)
+    os.makedirs(digest_dir, exist_ok=True)
+    members = {key: [] for key in keys}
+    for date_string, stats in sorted(state['days'].items()):
+        for key in _digest_keys(date_string):
+            if key in members:
+                members[key].append((date_string, stats))
+    for key, days in members.items():
+        digest_file = os.path.join(digest_dir, f'{key}.md')
+        if not days:
+            if os.path.exists(digest_file):
+                os.remove(digest_file)
+            continue
+        with open(digest_file, "w", encoding="utf-8") as f:
+            f.write(_render_digest(category, key, days))
+
+
+def update_rollups(md_folder, date_strings):
+    """
+    Fold changed day reports into the weekly, monthly and yearly digests.
+
+    Only the day reports of `date_strings` are parsed; the digests they belong
+    to are re-rendered from the per-day counts kept in `.rollup.json`.
+    """
+    state = _load_state(md_folder)
+    keys = set()
+    for date_string in date_strings:
+        stats = _day_stats(_day_report_file(md_folder, date_string))
+        if stats is None:
+            state['days'].pop(date_string, None)
+        else:
+            state['days'][date_string] = stats
+        keys.update(_digest_keys(date_string))
+    if keys:
+        _write_digests(md_folder, state, keys)
+        _save_state(md_folder, state)
+    return keys.__len__()
+
+
+def refresh_rollups(md_folder):
+    """
+    Pick up day reports edited outside of a fetch (e.g. items checked in Obsidian).
+
+    Day files are only stat'ed; those whose mtime or size differs from the
+    rollup state are re-parsed.
+    """
+    state = _load_state(md_folder)
+    changed = []
+    seen = set()
+    for date_string, file_path in iter_day_reports(md_folder):
+        seen.add(date_string)
+        st = os.stat(file_path)
+        stats = state['days'].get(date_string)
+        if stats is None or stats['stamp'] != [st.st_mtime, st.st_size]:
+            changed.append(date_string)
+    changed += sorted(set(state['days']) - seen)
+    n_digests = update_rollups(md_folder, changed)
+    if changed:
+        logger.info(f'Rollups: {changed.__len__()} day reports changed, {n_digests} digests rewritten')
+    return changed.__len__()
@@ -0,0 +1,266 @@
+import os
+import json
+import threading
+from datetime import date, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+from .report import parse_day_report, iter_day_reports, load_state, _get_arxiv_doi, _load_zotero
+from .revisit import REVISIT_FILE
+from . import arxiv_logger
+
+logger = arxiv_logger
+
+
+def _normalize_id(arxiv_id):
+    return arxiv_id if arxiv_id.startswith('arXiv:') else f'arXiv:{arxiv_id}'
+
+
+class ArxivIndex:
+    """
+    In-memory index of the day reports under an arxiv folder.
+
+    `refresh` only re-parses day files whose mtime or size changed, so it is
+    cheap to call after every scheduled fetch.
+    """
+
+    def __init__(self, arxiv_folder, categories, Zot_=None):
+        self.arxiv_folder = arxiv_folder
+        self.categories = categories
+        self.Zot_ = Zot_
+        self.papers = {}        # (category, arxiv_id) -> record, cross-listed papers have one per category
+        self.categories_of = {} # arxiv_id -> categories it is listed in
+        self.days = {}          # (category, date) -> [arxiv_id]
+        self.updated = {}       # (category, date) -> [arxiv_id]
+        self.detected = {}      # (category, date) -> date the update section last changed
+        self._files = {}        # file path -> ((mtime, size), (category, date))
+        self._sorted_days = []  # keys of self.days, newest first
+        self._lock = threading.RLock()
+
+    def _day_files(self):
+        for category in self.categories:
+            for date_string, file_path in iter_day_reports(os.path.join(self.arxiv_folder, category)):
+                yield category, date_string, file_path
+
+    def _drop(self, key):
+        category = key[0]
+        for arxiv_id in self.days.pop(key, []):
+            record = self.papers.get((category, arxiv_id), {})
+            if record.get('date') == key[1]:
+                del self.papers[(category, arxiv_id)]
+                categories = self.categories_of.get(arxiv_id, set())
+                categories.discard(category)
+                if not categories:
+                    self.categories_of.pop(arxiv_id, None)
+        self.updated.pop(key, None)
+        self.detected.pop(key, None)
+
+    def refresh(self, reload_zotero=False):
+        """
+        Pick up new, changed and deleted day reports.
+
+        Returns:
+            int: Number of day files that were (re)loaded or dropped
+        """
+        if reload_zotero:
+            self.Zot_ = _load_zotero()
+        n_changed = 0
+        seen = set()
+        revisits = {}
+        for category, date_string, file_path in self._day_files():
+            seen.add(file_path)
+            try:
+                st = os.stat(file_path)
+            except OSError:
+                continue
+            stamp = (st.st_mtime, st.st_size)
+            if self._files.get(file_path, (None,))[0] == stamp:
+                continue
+            report = parse_day_report(file_path)
+            if report is None:
+                continue
+            key = (category, date_string)
+            if category not in revisits:
+                revisits[category] = load_state(os.path.join(self.arxiv_folder, category, REVISIT_FILE), {})
+            # Changes found by a revisit are dated in .revisit.json, other rewrites by the file
+            detected = revisits[category].get(date_string, {}).get('last_changed')
+            if detected is None:
+                detected = date.fromtimestamp(st.st_mtime).isoformat()
+            with self._lock:
+                self._drop(key)
+                for paper in report['papers']:
+                    self.papers[(category, paper['arxiv_id'])] = dict(paper, date=date_string, category=category)
+                    self.categories_of.setdefault(paper['arxiv_id'], set()).add(category)
+                self.days[key] = [paper['arxiv_id'] for paper in report['papers']]
+                self.updated[key] = report['updated']
+                self.detected[key] = detected
+                self._files[file_path] = (stamp, key)
+            n_changed += 1
+
+        with self._lock:
+            for file_path in set(self._files) - seen:
+                self._drop(self._files.pop(file_path)[1])
+                n_changed += 1
+            if n_changed:
+                self._sorted_days = sorted(self.days, key=lambda k: k[1], reverse=True)
+        if n_changed:
+            logger.info(f'Index refreshed: {n_changed} day files, {self.papers.__len__()} papers')
+        return n_changed
+
+    def in_zotero(self, arxiv_id):
+        if self.Zot_ is None:
+            return None
+        try:
+            return self.Zot_.query_('DOI', _get_arxiv_doi(arxiv_id)).__len__() > 0
+        except Exception:
+            return None
+
+    def paper(self, arxiv_id, category=None):
+        """
+        The record of `category`, by default of the first category (in the
+        served order) listing the paper, with all of its categories.
+        """
+        arxiv_id = _normalize_id(arxiv_id)
+        with self._lock:
+            categories = self.categories_of.get(arxiv_id, set())
+            if category is None:
+                category = next((c for c in self.categories if c in categories), None)
+            record = self.papers.get((category, arxiv_id))
+            if record is None:
+                return None
+            categories = [c for c in self.categories if c in categories]
+        return dict(record, categories=categories, in_zotero=self.in_zotero(arxiv_id))
+
+    def day(self, category, date_string):
+        with self._lock:
+            return [self.papers[(category, i)] for i in self.days.get((category, date_string), [])
+                    if (category, i) in self.papers]
+
+    def select(self, category=None, collected=None, limit=100):
+        """Most recent papers first, optionally filtered by category and collected state"""
+        with self._lock:
+            res = []
+            for key in self._sorted_days:
+                if category not in (None, key[0]):
+                    continue
+                for arxiv_id in self.days[key]:
+                    record = self.papers.get((key[0], arxiv_id))
+                    if record is None or (collected is not None and record['collected'] != collected):
+                        continue
+                    res.append(record)
+                    if res.__len__() >= limit:
+                        return res
+            return res
+
+    def updates(self, days=7, category=None):
+        """
+        Papers of the update sections that changed in the last `days` days,
+        most recently detected first, whatever the date of their day report.
+        """
+        since = (date.today() - timedelta(days=days)).isoformat()
+        with self._lock:
+            keys = sorted(
+                (key for key in self.updated
+                 if self.updated[key] and self.detected[key] >= since and category in (None, key[0])),
+                key=lambda k: (self.detected[k], k[1]), reverse=True
+            )
+            return [
+                dict(self.papers[(key[0], i)], updated_on=self.detected[key])
+                for key in keys
+                for i in self.updated[key] if (key[0], i) in self.papers
+            ]
+
+
+def _flag(query, name):
+    if name not in query:
+        return None
+    return query[name][0].lower() in ('1', 'true', 'yes')
+
+
+class _Handler(BaseHTTPRequestHandler):
+    index = None
+
+    def _send(self, obj, status=200):
+        body = json.dumps(obj, ensure_ascii=False).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(body.__len__()))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        parts = [p for p in url.path.split('/') if p]
+        query = parse_qs(url.query)
+        category = query.get('category', [None])[0]
+        try:
+            limit = int(query.get('limit', ['100'])[0])
+            days = int(query.get('days', ['7'])[0])
+        except ValueError:
+            return self._send({'error': 'limit and days must be integers'}, 400)
+        index = self.index
+
+        if parts[:1] == ['paper'] and parts.__len__() == 2:
+            record = index.paper(parts[1], category)
+            if record is None:
+                return self._send({'error': f'{parts[1]} not found'}, 404)
+            return self._send(record)
+        if parts[:1] == ['day'] and parts.__len__() == 3:
+            return self._send(index.day(parts[1], parts[2]))
+        if parts[:1] == ['category'] and parts.__len__() == 2:
+            return self._send(index.select(parts[1], _flag(query, 'collected'), limit))
+        if parts == ['collected']:
+            return self._send(index.select(category, True, limit))
+        if parts == ['not_collected']:
+            return self._send(index.select(category, False, limit))
+        if parts == ['updates']:
+            return self._send(index.updates(days, category))
+        self._send({'error': 'unknown endpoint'}, 404)
+
+    def do_POST(self):
+        url = urlparse(self.path)
+        if url.path.rstrip('/') == '/refresh':
+            reload_zotero = bool(_flag(parse_qs(url.query), 'zotero'))
+            return self._send({'changed': self.index.refresh(reload_zotero)})
+        self._send({'error': 'unknown endpoint'}, 404)
+
+    def log_message(self, format, *args):
+        logger.debug(format % args)
+
+
+def serve(arxiv_folder, categories, host='127.0.0.1', port=8765, poll_interval=300):
+    """
+    Serve the fetched data as a local JSON API.
+
+    Endpoints:
+        GET  /paper/<arxiv_id>?category=...
+        GET  /day/<category>/<YYYY-MM-DD>
+        GET  /category/<category>?collected=1|0&limit=N
+        GET  /collected?category=...   /not_collected?category=...
+        GET  /updates?days=7&category=...
+        POST /refresh?zotero=1          re-read changed day reports (and Zotero)
+
+    The index is also refreshed every `poll_interval` seconds (0 disables it).
+    """
+    index = ArxivIndex(arxiv_folder, categories, _load_zotero())
+    index.refresh()
+
+    if poll_interval > 0:
+        stop = threading.Event()
+
+        def poll():
+            while not stop.wait(poll_interval):
+                try:
+                    index.refresh()
+                except Exception as e:
+                    logger.warning(f'Index refresh failed: {e}')
+        threading.Thread(target=poll, name='refresh', daemon=True).start()
+
+    handler = type('Handler', (_Handler,), {'index': index})
+    server = ThreadingHTTPServer((host, port), handler)
+    logger.info(f'Serving {index.papers.__len__()} papers on http://{host}:{port}')
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
@@ -0,0 +1,131 @@
+import re
+import unicodedata
+from functools import lru_cache
+from . import arxiv_logger
+
+logger = arxiv_logger
+
+# Letters NFKD does not decompose into ASCII
+_special_letters = str.maketrans({
+    'ß': 'ss', 'æ': 'ae', 'œ': 'oe', 'ø': 'o', 'ł': 'l', 'đ': 'd', 'ð': 'd', 'þ': 'th', 'ı': 'i',
+})
+
+_word = re.compile(r'[a-z0-9]+')
+
+# Dropped from surnames so that "van der Waals, J." and "J. van der Waals" agree.
+# Only stripped from the surname part: Le, Da, De, Di, Du are also given names
+_particles = {'van', 'von', 'der', 'den', 'de', 'del', 'della', 'di', 'da', 'du', 'la', 'le', 'dos', 'das', 'ter'}
+
+_suffixes = {'jr', 'sr', 'ii', 'iii', 'iv'}
+
+
+def _is_suffix(word):
+    return ''.join(_word.findall(word)) in _suffixes
+
+
+@lru_cache(maxsize=None)
+def normalize_name(name):
+    """
+    Normalize an author name.
+
+    Diacritics, case and suffixes (Jr., III) are dropped, "Last, First" is
+    reordered, and the given names are split into tokens so that initials
+    can be compared.
+
+    Returns:
+        tuple: (last name, (given name tokens...)), e.g.
+               'Schrödinger, E.' -> ('schrodinger', ('e',))
+               'Da-Wei Wang' -> ('wang', ('da', 'wei'))
+    """
+    name = name.lower()
+    if not name.isascii():
+        name = unicodedata.normalize('NFKD', name.translate(_special_letters))
+        name = ''.join(c for c in name if not unicodedata.combining(c))
+    parts = [p for i, p in enumerate(name.split(',')) if i == 0 or not _is_suffix(p)]
+    if parts.__len__() > 1:
+        last, given = parts[0], ' '.join(parts[1:]).split()
+        last_tokens = [t for word in last.split() if not _is_suffix(word) for t in _word.findall(word)]
+        last_tokens = [t for t in last_tokens if t not in _particles] or last_tokens
+    else:
+        words = name.split()
+        while words.__len__() > 1 and _is_suffix(words[-1]):
+            words.pop()
+        if not words:
+            return '', ()
+        last_tokens, given = _word.findall(words[-1]), words[:-1]
+        # "Johannes van der Waals": the particles just before the surname, never the first given name
+        while given.__len__() > 1 and ''.join(_word.findall(given[-1])) in _particles:
+            given.pop()
+    first_tokens = [t for word in given if not _is_suffix(word) for t in _word.findall(word)]
+    return (last_tokens[-1] if last_tokens else ''), tuple(first_tokens)
+
+
+def _given_names_match(a, b):
+    """'j' matches 'john', 'john' does not match 'jane'"""
+    for x, y in zip(a, b):
+        if x == y:
+            continue
+        if (len(x) == 1 or len(y) == 1) and x[0] == y[0]:
+            continue
+        return False
+    return True
+
+
+class Watchlist:
+    """
+    Hash index of watched authors.
+
+    Names are indexed by (last name, first initial), so matching an author
+    list costs one dict lookup per author plus a check of the given names.
+    """
+
+    def __init__(self, entries):
+        """
+        Args:
+            entries: (name, group) pairs, group may be None
+        """
+        self.index = {}
+        for name, group in entries:
+            last, first = normalize_name(name)
+            if not last or not first:
+                logger.warning(f'Watchlist entry needs a given name or initial: {name}')
+                continue
+            self.index.setdefault((last, first[0][0]), []).append((first, name, group))
+
+    @classmethod
+    def from_file(cls, file_path):
+        """
+        One author per line, optionally followed by `| group`; `#` starts a comment.
+
+            Erwin Schrödinger
+            Dirac, P. A. M. | quantum pioneers
+        """
+        entries = []
+        with open(file_path, "r", encoding="utf-8") as f:
+            for line in f:
+                line = line.split('#', 1)[0].strip()
+                if not line:
+                    continue
+                name, _, group = line.partition('|')
+                entries.append((name.strip(), group.strip() or None))
+        return cls(entries)
+
+    def __len__(self):
+        return sum(len(v) for v in self.index.values())
+
+    def match(self, authors):
+        """
+        Returns:
+            list: The authors of `authors` that are watched, labelled with
+                  their group if they have one
+        """
+        found = []
+        for author in authors:
+            last, first = normalize_name(author)
+            if not first:
+                continue
+            for watched_first, _, group in self.index.get((last, first[0][0]), ()):
+                if _given_names_match(first, watched_first):
+                    found.append(f'{author} ({group})' if group else author)
+                    break
+        return found
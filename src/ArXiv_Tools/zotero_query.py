@@ -10,10 +10,24 @@ class zotero_query:
 
         items = self.zot.everything(self.zot.items())
         self.items = items
+        self.build_index()
         # return items
+
+    def build_index(self, keys=('DOI',)):
+        """Hash index of `self.items` so that `query_` on these keys is a dict lookup"""
+        index = {}
+        for item in self.items:
+            for key in keys:
+                if key in item['data']:
+                    index.setdefault((key, item['data'][key]), []).append(item)
+        self.index_keys = set(keys)
+        self.index = index
     
     def query_(self, query_key: str='DOI',doi_string: str = '10.48550/arXiv.2502.07673'):
 
+        if query_key in getattr(self, 'index_keys', ()):
+            return list(self.index.get((query_key, doi_string), []))
+
         matching_items = [item for item in self.items if query_key in item['data'] and item['data'][query_key] == doi_string]
 
         return matching_items
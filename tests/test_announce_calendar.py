@@ -0,0 +1,63 @@
+import json
+import logging
+from datetime import date
+from ArXiv_Tools.announce_calendar import (record_empty_day, load_empty_days, plan_days, plan_fetch,
+                                           announcement_days, CALENDAR_FILE, EMPTY_THRESHOLD)
+
+TODAY = date(2025, 3, 1)
+
+
+def test_announcement_days():
+    # February 2025 starts on a Saturday
+    assert announcement_days(2025, 2)[:3] == [3, 4, 5]
+    assert 1 not in announcement_days(2025, 2)
+    assert announcement_days(2025, 2, 'advance') == list(range(1, 29))
+
+
+def test_empty_days_persisted(tmp_path):
+    md_folder = str(tmp_path / 'quant-ph')
+    record_empty_day(md_folder, '2025-02-17', TODAY)
+    record_empty_day(md_folder, '2025-02-17', TODAY)
+    record_empty_day(md_folder, '2025-02-18', TODAY)
+
+    assert load_empty_days(md_folder) == {'2025-02-17': 2, '2025-02-18': 1}
+    with open(tmp_path / 'quant-ph' / CALENDAR_FILE, encoding='utf-8') as f:
+        assert json.load(f) == {'empty': {'2025-02-17': 2, '2025-02-18': 1}}
+
+
+def test_today_and_future_are_not_learned(tmp_path):
+    md_folder = str(tmp_path)
+    record_empty_day(md_folder, '2025-03-01', TODAY)
+    record_empty_day(md_folder, '2025-03-03', TODAY)
+    assert load_empty_days(md_folder) == {}
+
+
+def test_learned_holiday_skipped_after_threshold(tmp_path):
+    md_folder = str(tmp_path)
+    for _ in range(EMPTY_THRESHOLD - 1):
+        record_empty_day(md_folder, '2025-02-17', TODAY)
+    assert 17 in plan_days(2025, 2, md_folder, today=TODAY)
+
+    record_empty_day(md_folder, '2025-02-17', TODAY)
+    days = plan_days(2025, 2, md_folder, today=TODAY)
+    assert 17 not in days
+    assert days.__len__() == announcement_days(2025, 2).__len__() - 1
+
+
+def test_unreadable_calendar_is_ignored(tmp_path):
+    (tmp_path / CALENDAR_FILE).write_text('{broken', encoding='utf-8')
+    assert load_empty_days(str(tmp_path)) == {}
+    assert plan_days(2025, 2, str(tmp_path), 3, today=TODAY) == [3]
+
+
+def test_future_days_not_planned(tmp_path):
+    plan = plan_fetch([(2025, 3, None)], str(tmp_path), today=date(2025, 3, 5))
+    assert plan == [(2025, 3, 3), (2025, 3, 4), (2025, 3, 5)]
+
+
+def test_skipped_specific_day_is_logged(tmp_path, caplog):
+    with caplog.at_level(logging.INFO, logger='arxiv'):
+        assert plan_days(2025, 11, str(tmp_path), 15, today=date(2025, 12, 1)) == []
+        assert plan_days(2025, 2, str(tmp_path), 30, today=TODAY) == []
+    assert 'Skip 2025-11-15: not an announcement day, arXiv does not announce on weekends' in caplog.text
+    assert 'Skip 2025-02-30: not an announcement day, the date does not exist' in caplog.text
@@ -0,0 +1,35 @@
+import time
+from datetime import datetime
+from ArXiv_Tools import report
+from ArXiv_Tools.deadline import parse_deadline, SummaryCache
+
+
+def test_parse_deadline():
+    now = datetime(2025, 2, 3, 9, 0).timestamp()
+    assert parse_deadline('30', now) == now + 1800
+    assert parse_deadline('09:30', now) == datetime(2025, 2, 3, 9, 30).timestamp()
+    # Already passed today
+    assert parse_deadline('08:30', now) == datetime(2025, 2, 4, 8, 30).timestamp()
+    assert parse_deadline('09:00', now) == datetime(2025, 2, 4, 9, 0).timestamp()
+
+
+class _Fulltexts:
+    def __init__(self):
+        self.read = []
+
+    def get_text(self, arxiv_id, kind):
+        self.read.append(arxiv_id)
+        return 'full text'
+
+
+def test_summarize_until_reads_top_n_fulltexts(tmp_path, monkeypatch):
+    monkeypatch.setattr(report, '_ai_summary', lambda title, abstract, provider, fulltext: ('summary', None))
+    papers = [{'arxiv_id': f'arXiv:2502.0000{i}', 'date': '2025-02-03', 'collected': i == 0, 'summary': None,
+               'title': 'T', 'authors': [], 'abstract': 'A'} for i in range(5)]
+    fulltexts = _Fulltexts()
+
+    changed = report._summarize_until({'2025-02-03': (papers, None)}, time.time() + 30, 'gemini', 2,
+                                      SummaryCache(str(tmp_path)), fulltexts, 'pdf', fulltext_top_n=2)
+    assert changed == {'2025-02-03'}
+    assert all(p['summary'] == ('summary', None) for p in papers)
+    assert sorted(fulltexts.read) == ['arXiv:2502.00001', 'arXiv:2502.00002']
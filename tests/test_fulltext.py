@@ -0,0 +1,177 @@
+import io
+import os
+import time
+import tarfile
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import pytest
+from ArXiv_Tools import fulltext
+from ArXiv_Tools.fulltext import FulltextCache
+
+
+def _pdf(text):
+    """Smallest PDF pypdf extracts `text` from"""
+    stream = f'BT /F1 12 Tf 72 720 Td ({text}) Tj ET'.encode()
+    objects = [
+        b'<< /Type /Catalog /Pages 2 0 R >>',
+        b'<< /Type /Pages /Kids [3 0 R] /Count 1 >>',
+        b'<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] '
+        b'/Resources << /Font << /F1 5 0 R >> >> /Contents 4 0 R >>',
+        b'<< /Length %d >>\nstream\n' % len(stream) + stream + b'\nendstream',
+        b'<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>',
+    ]
+    out = b'%PDF-1.4\n'
+    offsets = []
+    for i, obj in enumerate(objects, 1):
+        offsets.append(len(out))
+        out += b'%d 0 obj\n' % i + obj + b'\nendobj\n'
+    xref = len(out)
+    out += b'xref\n0 %d\n0000000000 65535 f \n' % (len(objects) + 1)
+    out += b''.join(b'%010d 00000 n \n' % o for o in offsets)
+    out += b'trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n' % (len(objects) + 1, xref)
+    return out
+
+
+def _tarball(files):
+    buf = io.BytesIO()
+    with tarfile.open(fileobj=buf, mode='w:gz') as tar:
+        for name, content in files.items():
+            info = tarfile.TarInfo(name)
+            info.size = len(content)
+            tar.addfile(info, io.BytesIO(content))
+    return buf.getvalue()
+
+
+@pytest.fixture
+def server():
+    """Local stand-in for arxiv.org/pdf and arxiv.org/e-print, counting requests per path"""
+    files, hits = {}, {}
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            hits[self.path] = hits.get(self.path, 0) + 1
+            if self.path not in files:
+                self.send_error(404)
+                return
+            self.send_response(200)
+            self.send_header('Content-Length', str(len(files[self.path])))
+            self.end_headers()
+            self.wfile.write(files[self.path])
+
+        def log_message(self, format, *args):
+            pass
+
+    httpd = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    base = f'http://127.0.0.1:{httpd.server_port}'
+    yield files, hits, {'pdf': f'{base}/pdf/', 'source': f'{base}/e-print/'}
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def _blobs(root):
+    return [name for _, _, names in os.walk(os.path.join(root, 'objects')) for name in names]
+
+
+def test_pdf_downloaded_once(server, tmp_path):
+    pytest.importorskip('pypdf')
+    files, hits, urls = server
+    files['/pdf/2502.00001'] = _pdf('Hello fulltext')
+    cache = FulltextCache(str(tmp_path), urls=urls)
+
+    assert 'Hello fulltext' in cache.get_text('arXiv:2502.00001', 'pdf')
+    assert 'Hello fulltext' in cache.get_text('arXiv:2502.00001', 'pdf')
+    assert hits['/pdf/2502.00001'] == 1
+
+
+def test_source_tarball(server, tmp_path):
+    files, _, urls = server
+    files['/e-print/2502.00002'] = _tarball({'main.tex': b'\\section{Intro} tarball text', 'fig.png': b'\x89PNG'})
+    cache = FulltextCache(str(tmp_path), urls=urls)
+
+    text = cache.get_text('arXiv:2502.00002', 'source')
+    assert 'tarball text' in text
+    assert 'PNG' not in text
+
+
+def test_source_of_pdf_only_submission(server, tmp_path):
+    pytest.importorskip('pypdf')
+    files, _, urls = server
+    files['/e-print/2502.00003'] = _pdf('Only a PDF')
+    cache = FulltextCache(str(tmp_path), urls=urls)
+
+    text = cache.get_text('arXiv:2502.00003', 'source')
+    assert 'Only a PDF' in text
+    assert '%PDF' not in text
+
+
+def test_failed_extraction_leaves_no_blob(server, tmp_path, monkeypatch):
+    files, hits, urls = server
+    files['/e-print/2502.00004'] = b'plain tex'
+    cache = FulltextCache(str(tmp_path), urls=urls)
+
+    def broken(data):
+        raise ValueError('broken')
+    monkeypatch.setitem(fulltext._extractors, 'source', broken)
+    assert cache.get_text('arXiv:2502.00004', 'source') is None
+    assert _blobs(str(tmp_path)) == []
+
+    monkeypatch.undo()
+    assert cache.get_text('arXiv:2502.00004', 'source') == 'plain tex'
+    assert hits['/e-print/2502.00004'] == 2
+
+
+def test_no_text_is_not_cached(server, tmp_path, monkeypatch):
+    # e.g. pypdf is not installed
+    files, hits, urls = server
+    files['/e-print/2502.00005'] = b'plain tex'
+    cache = FulltextCache(str(tmp_path), urls=urls)
+
+    monkeypatch.setitem(fulltext._extractors, 'source', lambda data: None)
+    assert cache.get_text('arXiv:2502.00005', 'source') is None
+    assert _blobs(str(tmp_path)) == []
+    assert cache.index == {}
+
+    monkeypatch.undo()
+    assert cache.get_text('arXiv:2502.00005', 'source') == 'plain tex'
+    assert hits['/e-print/2502.00005'] == 2
+
+
+def test_blob_without_text_is_fetched_again(server, tmp_path):
+    files, hits, urls = server
+    files['/e-print/2502.00006'] = b'plain tex'
+    cache = FulltextCache(str(tmp_path), urls=urls)
+    cache.get_text('arXiv:2502.00006', 'source')
+    # Left behind by older versions
+    os.remove(cache._blob_path(cache.index['source:arXiv:2502.00006']['sha']) + '.txt')
+
+    assert cache.get_text('arXiv:2502.00006', 'source') == 'plain tex'
+    assert hits['/e-print/2502.00006'] == 2
+
+
+def test_missing_paper(server, tmp_path):
+    _, _, urls = server
+    cache = FulltextCache(str(tmp_path), urls=urls)
+    assert cache.get_text('arXiv:2502.99999', 'pdf') is None
+
+
+def test_lru_order_survives_restart(server, tmp_path):
+    files, hits, urls = server
+    for i in range(3):
+        files[f'/e-print/2502.0001{i}'] = bytes([ord('a') + i]) * 1000
+    # Room for two papers, each 1000 bytes of blob and 1000 of text
+    cache = FulltextCache(str(tmp_path), max_bytes=4500, urls=urls)
+    cache.get_text('arXiv:2502.00010', 'source')
+    time.sleep(0.01)
+    cache.get_text('arXiv:2502.00011', 'source')
+    time.sleep(0.01)
+    cache.get_text('arXiv:2502.00010', 'source')  # hit, only recorded in memory
+    cache.close()
+
+    cache = FulltextCache(str(tmp_path), max_bytes=4500, urls=urls)
+    cache.get_text('arXiv:2502.00012', 'source')
+    assert sorted(cache.index) == ['source:arXiv:2502.00010', 'source:arXiv:2502.00012']
+    assert _blobs(str(tmp_path)).__len__() == 4
+
+    cache.get_text('arXiv:2502.00010', 'source')
+    assert hits['/e-print/2502.00010'] == 1
@@ -0,0 +1,86 @@
+import time
+import threading
+from ArXiv_Tools.pipeline import Pipeline
+
+
+def _pipeline_threads():
+    return [t for t in threading.enumerate() if t.name == 'source' or t.name.split('-')[0] in ('double', 'slow')]
+
+
+def _wait_for(condition, timeout=2.0):
+    end = time.time() + timeout
+    while time.time() < end:
+        if condition():
+            return True
+        time.sleep(0.01)
+    return condition()
+
+
+def test_all_items_through_every_stage():
+    pipe = Pipeline(range(50), queue_size=4)
+    pipe.add_stage('double', lambda x, emit: (emit(x), emit(x + 1000)), n_workers=3)
+    pipe.add_stage('slow', lambda x, emit: emit(x * 2), n_workers=2)
+
+    assert sorted(pipe) == sorted([2 * x for x in range(50)] + [2 * (x + 1000) for x in range(50)])
+    assert _wait_for(lambda: not _pipeline_threads())
+
+
+def test_failing_item_is_skipped():
+    def stage(x, emit):
+        if x == 3:
+            raise ValueError('bad item')
+        emit(x)
+
+    pipe = Pipeline(range(6), queue_size=2)
+    pipe.add_stage('double', stage, n_workers=2)
+    assert sorted(pipe) == [0, 1, 2, 4, 5]
+
+
+def test_backpressure_bounds_work_in_flight():
+    produced = []
+
+    def source():
+        for i in range(1000):
+            produced.append(i)
+            yield i
+
+    queue_size = 2
+    pipe = Pipeline(source(), queue_size=queue_size)
+    pipe.add_stage('double', lambda x, emit: emit(x), n_workers=1)
+    pipe.add_stage('slow', lambda x, emit: emit(x), n_workers=1)
+
+    items = iter(pipe)
+    assert next(items) == 0
+    # Nobody consumes now: every queue fills up, then the source must block
+    time.sleep(0.3)
+    # 3 full queues, one item held by each worker and by the source, one yielded
+    bound = queue_size * 3 + 2 + 1 + 1
+    assert produced.__len__() <= bound
+
+    assert list(items) == list(range(1, 1000))
+
+
+def test_early_break_stops_workers():
+    produced = []
+    release = threading.Event()
+
+    def source():
+        for i in range(10000):
+            produced.append(i)
+            yield i
+
+    def slow(x, emit):
+        release.wait(0.01)
+        emit(x)
+
+    pipe = Pipeline(source(), queue_size=4)
+    pipe.add_stage('double', lambda x, emit: emit(x), n_workers=2)
+    pipe.add_stage('slow', slow, n_workers=2)
+    for item in pipe:
+        if item >= 3:
+            break
+
+    assert _wait_for(lambda: not _pipeline_threads())
+    n_produced = produced.__len__()
+    time.sleep(0.1)
+    assert produced.__len__() == n_produced < 10000
@@ -0,0 +1,68 @@
+from ArXiv_Tools.report import (_write_day_report, _carry_over, _paper_markdown, parse_day_report,
+                                parse_old_report)
+
+DATE = '2025-02-03'
+
+
+def _papers(ids, watched=()):
+    papers = []
+    for arxiv_id in ids:
+        paper = {'arxiv_id': arxiv_id, 'title': f'Title {arxiv_id}', 'authors': ['Ada Lovelace'],
+                 'abstract': 'An abstract.', 'collected': False, 'summary': None,
+                 'watched': ['Ada Lovelace'] if arxiv_id in watched else []}
+        paper['markdown'] = _paper_markdown(paper)
+        papers.append(paper)
+    return papers
+
+
+def _rewrite(md_folder, ids, watched=()):
+    """Write the day again the way `filter_arxiv_to_md` does"""
+    old_report = parse_day_report(str(md_folder / '2025' / '02' / '03.md'))
+    papers = _papers(ids, watched)
+    if old_report is not None:
+        _carry_over(papers, old_report)
+    return _write_day_report(str(md_folder), 'quant-ph', DATE, papers, old_report=old_report)
+
+
+def _check(file_path, line):
+    with open(file_path, encoding='utf-8') as f:
+        text = f.read()
+    assert line in text
+    with open(file_path, 'w', encoding='utf-8') as f:
+        f.write(text.replace(line, line.replace('- [ ]', '- [x]')))
+
+
+def test_update_section_survives_rewrites(tmp_path):
+    file_path = _rewrite(tmp_path, ['arXiv:2502.00001'])
+    assert parse_day_report(file_path)['updated'] == []
+
+    _rewrite(tmp_path, ['arXiv:2502.00001', 'arXiv:2502.00002'])
+    _check(file_path, '- [ ] [[#arXiv:2502.00002]]\n')
+
+    # Nothing new: the earlier update and its check are kept
+    _rewrite(tmp_path, ['arXiv:2502.00001', 'arXiv:2502.00002'])
+    report = parse_day_report(file_path)
+    assert report['updated'] == ['arXiv:2502.00002']
+    assert report['checked_links'] == [['update', 'arXiv:2502.00002']]
+
+    _rewrite(tmp_path, ['arXiv:2502.00001', 'arXiv:2502.00002', 'arXiv:2502.00003'])
+    report = parse_day_report(file_path)
+    assert report['updated'] == ['arXiv:2502.00002', 'arXiv:2502.00003']
+    assert report['checked_links'] == [['update', 'arXiv:2502.00002']]
+
+
+def test_watched_check_survives_rewrite(tmp_path):
+    file_path = _rewrite(tmp_path, ['arXiv:2502.00001', 'arXiv:2502.00002'], watched=['arXiv:2502.00002'])
+    _check(file_path, '- [ ] [[#arXiv:2502.00002]] Ada Lovelace\n')
+
+    _rewrite(tmp_path, ['arXiv:2502.00001', 'arXiv:2502.00002'], watched=['arXiv:2502.00002'])
+    report = parse_day_report(file_path)
+    assert report['watched'] == {'arXiv:2502.00002': ['Ada Lovelace']}
+    assert report['checked_links'] == [['watched authors', 'arXiv:2502.00002']]
+    assert not any(p['checked'] for p in report['papers'])
+
+
+def test_parse_old_report(tmp_path):
+    assert parse_old_report(str(tmp_path / 'missing.md')) is None
+    file_path = _rewrite(tmp_path, ['arXiv:2502.00002', 'arXiv:2502.00001'])
+    assert parse_old_report(file_path) == ['arXiv:2502.00001', 'arXiv:2502.00002']
@@ -0,0 +1,72 @@
+import os
+from ArXiv_Tools.report import _write_day_report, _paper_markdown
+from ArXiv_Tools.rollup import refresh_rollups, DIGEST_DIR
+
+DAYS = ['2024-12-31', '2025-01-06', '2025-01-31', '2025-02-03', '2025-02-04', '2025-02-10']
+
+
+def _write(md_folder, date_string, n=3):
+    papers = []
+    for i in range(n):
+        paper = {'arxiv_id': f"arXiv:{date_string[2:4]}{date_string[5:7]}.{date_string[8:]}{i:03}",
+                 'title': 'T', 'authors': ['Ada Lovelace'], 'abstract': 'A', 'collected': i == 0, 'watched': []}
+        paper['markdown'] = _paper_markdown(paper)
+        papers.append(paper)
+    return _write_day_report(md_folder, 'quant-ph', date_string, papers)
+
+
+def _digests(md_folder):
+    """digest name -> (mtime, content)"""
+    digest_dir = os.path.join(md_folder, DIGEST_DIR)
+    res = {}
+    for name in sorted(os.listdir(digest_dir)):
+        with open(os.path.join(digest_dir, name), encoding='utf-8') as f:
+            res[name] = (os.stat(os.path.join(digest_dir, name)).st_mtime_ns, f.read())
+    return res
+
+
+def _backdate(md_folder):
+    digest_dir = os.path.join(md_folder, DIGEST_DIR)
+    for name in os.listdir(digest_dir):
+        os.utime(os.path.join(digest_dir, name), (1e9, 1e9))
+
+
+def test_only_touched_digests_rewritten(tmp_path):
+    md_folder = str(tmp_path / 'quant-ph')
+    files = {d: _write(md_folder, d) for d in DAYS}
+    assert refresh_rollups(md_folder) == DAYS.__len__()
+    assert sorted(_digests(md_folder)) == [
+        '2024-12.md', '2024.md', '2025-01.md', '2025-02.md', '2025-W01.md', '2025-W02.md', '2025-W05.md',
+        '2025-W06.md', '2025-W07.md', '2025.md']
+    assert refresh_rollups(md_folder) == 0
+
+    _backdate(md_folder)
+    before = _digests(md_folder)
+    # Check an item in Obsidian
+    with open(files['2025-02-04'], encoding='utf-8') as f:
+        text = f.read()
+    with open(files['2025-02-04'], 'w', encoding='utf-8') as f:
+        f.write(text.replace('- [ ] [arXiv:', '- [x] [arXiv:', 1))
+
+    assert refresh_rollups(md_folder) == 1
+    after = _digests(md_folder)
+    rewritten = sorted(name for name in after if after[name][0] != before[name][0])
+    assert rewritten == ['2025-02.md', '2025-W06.md', '2025.md']
+    for name in rewritten:
+        assert 'checked: 1' in after[name][1]
+        assert 'checked: 0' in before[name][1]
+
+
+def test_deleted_day_drops_its_digests(tmp_path):
+    md_folder = str(tmp_path / 'quant-ph')
+    files = {d: _write(md_folder, d) for d in DAYS}
+    refresh_rollups(md_folder)
+    _backdate(md_folder)
+    before = _digests(md_folder)
+
+    os.remove(files['2024-12-31'])
+    assert refresh_rollups(md_folder) == 1
+    after = _digests(md_folder)
+    # 2024-12-31 is in ISO week 2025-W01, which has no other day
+    assert '2024-12.md' not in after and '2024.md' not in after and '2025-W01.md' not in after
+    assert all(after[name] == before[name] for name in after)
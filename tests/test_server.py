@@ -0,0 +1,122 @@
+import os
+import json
+import threading
+import urllib.request
+from urllib.error import HTTPError
+from datetime import date, datetime, timedelta
+from http.server import ThreadingHTTPServer
+import pytest
+from ArXiv_Tools.report import _write_day_report, _paper_markdown, parse_day_report
+from ArXiv_Tools.revisit import REVISIT_FILE
+from ArXiv_Tools.server import ArxivIndex, _Handler
+
+
+def _write(arxiv_folder, category, date_string, ids, collected=()):
+    md_folder = str(arxiv_folder / category)
+    old_report = parse_day_report(os.path.join(md_folder, *date_string.split('-')[:2], date_string[8:] + '.md'))
+    papers = []
+    for arxiv_id in ids:
+        paper = {'arxiv_id': arxiv_id, 'title': f'Title {arxiv_id}', 'authors': ['Ada Lovelace'],
+                 'abstract': 'An abstract.', 'collected': arxiv_id in collected, 'watched': []}
+        paper['markdown'] = _paper_markdown(paper)
+        papers.append(paper)
+    return _write_day_report(md_folder, category, date_string, papers, old_report=old_report)
+
+
+def _age(file_path, days):
+    t = (datetime.now() - timedelta(days=days)).timestamp()
+    os.utime(file_path, (t, t))
+
+
+@pytest.fixture
+def vault(tmp_path):
+    _write(tmp_path, 'quant-ph', '2025-02-03', ['arXiv:2502.00001', 'arXiv:2502.00002'], collected=['arXiv:2502.00001'])
+    _write(tmp_path, 'quant-ph', '2025-02-04', ['arXiv:2502.00003'])
+    _write(tmp_path, 'chem-ph', '2025-02-04', ['arXiv:2502.00002', 'arXiv:2502.00004'])
+    return tmp_path
+
+
+def test_index(vault):
+    index = ArxivIndex(str(vault), ['quant-ph', 'chem-ph'])
+    assert index.refresh() == 3
+
+    record = index.paper('2502.00002')
+    assert record['category'] == 'quant-ph' and record['date'] == '2025-02-03'
+    assert record['categories'] == ['quant-ph', 'chem-ph']
+    assert index.paper('2502.00002', 'chem-ph')['date'] == '2025-02-04'
+    assert index.paper('2502.99999') is None
+
+    assert [p['arxiv_id'] for p in index.day('chem-ph', '2025-02-04')] == ['arXiv:2502.00002', 'arXiv:2502.00004']
+    assert [p['arxiv_id'] for p in index.select('quant-ph')] == [
+        'arXiv:2502.00003', 'arXiv:2502.00001', 'arXiv:2502.00002']
+    assert [p['arxiv_id'] for p in index.select(collected=True)] == ['arXiv:2502.00001']
+
+
+def test_refresh_only_reads_changed_files(vault):
+    index = ArxivIndex(str(vault), ['quant-ph', 'chem-ph'])
+    index.refresh()
+    assert index.refresh() == 0
+
+    _write(vault, 'quant-ph', '2025-02-04', ['arXiv:2502.00003', 'arXiv:2502.00005'])
+    assert index.refresh() == 1
+    assert index.paper('2502.00005')['date'] == '2025-02-04'
+
+    os.remove(vault / 'chem-ph' / '2025' / '02' / '04.md')
+    assert index.refresh() == 1
+    assert index.paper('2502.00004') is None
+    assert index.paper('2502.00002')['categories'] == ['quant-ph']
+
+
+def test_updates_by_detection_date(vault):
+    # An old day that a revisit changed today
+    _write(vault, 'quant-ph', '2024-01-02', ['arXiv:2401.00001'])
+    _write(vault, 'quant-ph', '2024-01-02', ['arXiv:2401.00001', 'arXiv:2401.00002'])
+    with open(vault / 'quant-ph' / REVISIT_FILE, 'w', encoding='utf-8') as f:
+        json.dump({'2024-01-02': {'checks': 3, 'changes': 1, 'last_changed': date.today().isoformat()}}, f)
+    # A recent day whose update was detected a month ago
+    _write(vault, 'quant-ph', '2025-02-03', ['arXiv:2502.00001', 'arXiv:2502.00002', 'arXiv:2502.00006'])
+    _age(vault / 'quant-ph' / '2025' / '02' / '03.md', 30)
+
+    index = ArxivIndex(str(vault), ['quant-ph', 'chem-ph'])
+    index.refresh()
+    updates = index.updates(days=7)
+    assert [(p['arxiv_id'], p['updated_on']) for p in updates] == [('arXiv:2401.00002', date.today().isoformat())]
+    assert [p['arxiv_id'] for p in index.updates(days=40)] == ['arXiv:2401.00002', 'arXiv:2502.00006']
+    assert index.updates(days=40, category='chem-ph') == []
+
+
+@pytest.fixture
+def api(vault):
+    index = ArxivIndex(str(vault), ['quant-ph', 'chem-ph'])
+    index.refresh()
+    httpd = ThreadingHTTPServer(('127.0.0.1', 0), type('Handler', (_Handler,), {'index': index}))
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    base = f'http://127.0.0.1:{httpd.server_port}'
+
+    def request(path, method='GET'):
+        try:
+            with urllib.request.urlopen(urllib.request.Request(base + path, method=method)) as response:
+                return response.status, json.load(response)
+        except HTTPError as e:
+            return e.code, json.load(e)
+    yield request
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def test_handler(api, vault):
+    status, record = api('/paper/2502.00002?category=chem-ph')
+    assert status == 200 and record['date'] == '2025-02-04'
+    assert api('/paper/2502.99999')[0] == 404
+    assert api('/nothing')[0] == 404
+    assert api('/collected?limit=ten')[0] == 400
+    assert api('/updates?days=week')[0] == 400
+
+    status, papers = api('/category/quant-ph?collected=0&limit=1')
+    assert status == 200 and [p['arxiv_id'] for p in papers] == ['arXiv:2502.00003']
+    assert [p['arxiv_id'] for p in api('/day/quant-ph/2025-02-03')[1]] == ['arXiv:2502.00001', 'arXiv:2502.00002']
+
+    _write(vault, 'chem-ph', '2025-02-05', ['arXiv:2502.00007'])
+    assert api('/refresh', 'POST') == (200, {'changed': 1})
+    assert api('/paper/2502.00007')[1]['category'] == 'chem-ph'
+    assert api('/refresh/x', 'POST')[0] == 404